@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+'''
+Runs request-like tasks against AsyncDBStorage, one at a time and then
+<concurrency> at once, each getting a state by id and counting the states
+on its own session, and prints the requests/sec.
+Uses HBNB_DB_ASYNC_URL, by default a scratch SQLite file through aiosqlite
+(pip install 'sqlalchemy[asyncio]' aiosqlite), with HBNB_DB_URL on the same
+file for the synchronous storage the models are imported with.
+
+Usage: ./benchmarks/async_db.py [<requests> [<concurrency>]]
+(2000 requests and 50 at once by default)
+'''
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+
+async def request(storage, State, state_id):
+    '''Serves a request: gets a state and counts the states'''
+    try:
+        await storage.get(State, state_id)
+        await storage.count(State)
+    finally:
+        await storage.close()
+
+
+async def rate(storage, State, ids, concurrency):
+    '''Returns the requests/sec of serving ids, concurrency at a time'''
+    slots = asyncio.Semaphore(concurrency)
+
+    async def serve(state_id):
+        '''Serves a request once a slot is free'''
+        async with slots:
+            await request(storage, State, state_id)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(serve(state_id) for state_id in ids))
+    return len(ids) / (time.perf_counter() - start)
+
+
+async def main(requests, concurrency):
+    '''Fills the states and times both runs'''
+    from models.engine.async_db_storage import AsyncDBStorage
+    from models.state import State
+
+    storage = AsyncDBStorage()
+    await storage.reload()
+    states = [State(name=f'State {i}') for i in range(100)]
+    for state in states:
+        storage.new(state)
+    await storage.save()
+    await storage.close()
+
+    ids = [states[i % len(states)].id for i in range(requests)]
+    print(f'{requests} requests')
+    print(f'1 at a time  {await rate(storage, State, ids, 1):8.0f} req/s')
+    print(f'{concurrency} at a time '
+          f'{await rate(storage, State, ids, concurrency):8.0f} req/s')
+    await storage.dispose()
+
+
+if __name__ == '__main__':
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.db')
+        os.environ['HBNB_TYPE_STORAGE'] = 'db'
+        os.environ.setdefault('HBNB_DB_URL', f'sqlite:///{path}')
+        os.environ.setdefault('HBNB_DB_ASYNC_URL',
+                              f'sqlite+aiosqlite:///{path}')
+        asyncio.run(main(requests, concurrency))
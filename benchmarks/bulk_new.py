@@ -0,0 +1,45 @@
+#!/usr/bin/python3
+'''
+Compares saving objects one by one with bulk_new(), in rows/sec,
+with the storage selected by HBNB_TYPE_STORAGE (in DB mode, the states
+stay in the database: point it at a scratch one).
+
+Usage: ./benchmarks/bulk_new.py [<size>]
+(2000 objects by default)
+'''
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from models import storage  # noqa: E402
+from models.state import State  # noqa: E402
+
+
+def rate(func, size):
+    '''Returns the rows/sec of func creating size states'''
+    states = [State(name=f'State {i}') for i in range(size)]
+    start = time.perf_counter()
+    func(states)
+    return size / (time.perf_counter() - start)
+
+
+def one_by_one(states):
+    '''Saves the states one by one'''
+    for state in states:
+        state.save()
+
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as directory:
+        if os.getenv('HBNB_TYPE_STORAGE') != 'db':
+            path = os.path.join(directory, 'f')
+            type(storage)._FileStorage__file_path = path
+
+        print(f'{size} objects')
+        print(f'save()     {rate(one_by_one, size):10.0f} rows/s')
+        print(f'bulk_new() {rate(storage.bulk_new, size):10.0f} rows/s')
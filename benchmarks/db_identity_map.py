@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+'''
+Soak test of DBStorage: a worker gets the states of a large table one by
+one and keeps one in ten, and the objects in the session and the memory
+traced are reported as it goes, unbounded and then with HBNB_DB_CACHE_MAX
+set to a tenth of the table: the states kept stay in the session.
+Needs HBNB_TYPE_STORAGE=db and a scratch database: the rows stay there.
+
+Usage: ./benchmarks/db_identity_map.py [<size> [<rounds>]]
+(100000 states and 10 rounds by default)
+'''
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from models import storage  # noqa: E402
+from models.engine.db_storage import DBStorage  # noqa: E402
+from models.state import State  # noqa: E402
+
+
+def soak(ids, rounds, cache_max):
+    '''Prints the session size and memory after each round of gets'''
+    DBStorage._DBStorage__cache_max = cache_max
+    storage.close()
+    gc.collect()
+
+    tracemalloc.start()
+    kept = []
+    step = -(-len(ids) // rounds)
+    for i in range(rounds):
+        for j, state_id in enumerate(ids[i * step:(i + 1) * step]):
+            state = storage.get(State, state_id)
+            if j % 10 == 0:
+                kept.append(state)
+        gc.collect()
+        held = len(storage._DBStorage__session().identity_map)
+        used = tracemalloc.get_traced_memory()[0]
+        print(f'  round {i + 1:3}: {held:8} objects in session, '
+              f'{used / 1024 / 1024:8.1f} MiB')
+    tracemalloc.stop()
+    storage.close()
+
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    missing = size - storage.count(State)
+    if missing > 0:
+        storage.bulk_new(State(name=f'State {i}') for i in range(missing))
+
+    ids = [state.id for state in storage.iter(State)][:size]
+    print('unbounded')
+    soak(ids, rounds, 0)
+    print(f'HBNB_DB_CACHE_MAX={size // 10}')
+    soak(ids, rounds, size // 10)
@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+'''
+Compares the save and reload times and the file size of the FileStorage
+file formats.
+
+Usage: ./benchmarks/file_storage_formats.py [<size> ...]
+(10000, 100000 and 1000000 objects by default)
+'''
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from models import storage  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.engine.serializers import serializers  # noqa: E402
+from models.place import Place  # noqa: E402
+from models.review import Review  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+def populate(size):
+    '''Fills the storage with size objects, mostly reviews'''
+    FileStorage._FileStorage__objects = {}
+    user = User(email='bench@hbnb.io', password='bench')
+    storage.new(user)
+    place = None
+    for i in range(size - 1):
+        if i % 100 == 0:
+            place = Place(name=f'Place {i}', user_id=user.id,
+                          price_by_night=i % 500, latitude=31.5,
+                          longitude=-4.5)
+            storage.new(place)
+        else:
+            storage.new(Review(text=f'Review {i}', place_id=place.id,
+                               user_id=user.id))
+
+
+def run(size, directory):
+    '''Prints the benchmark results of every format for size objects'''
+    for name, serializer in serializers.items():
+        path = os.path.join(directory, f'{size}.{name}')
+        FileStorage._FileStorage__file_path = path
+        FileStorage._FileStorage__serializer = serializer()
+
+        populate(size)
+        start = time.perf_counter()
+        storage.save()
+        save_time = time.perf_counter() - start
+
+        FileStorage._FileStorage__objects = {}
+        start = time.perf_counter()
+        storage.reload()
+        reload_time = time.perf_counter() - start
+
+        print(f'{size:>9} {name:<7} save {save_time:8.3f}s  '
+              f'reload {reload_time:8.3f}s  '
+              f'size {os.path.getsize(path) / 1e6:9.2f} MB')
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000]
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            run(size, directory)
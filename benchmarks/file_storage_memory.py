@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+'''
+Compares the memory per stored object of FileStorage once reloaded,
+with built objects (default) and with compact records (lazy mode),
+before anything reads them: objects read are built, at the full size.
+
+Usage: ./benchmarks/file_storage_memory.py [<size>]
+(100000 objects by default)
+'''
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from models import storage  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.review import Review  # noqa: E402
+
+
+def measure(lazy):
+    '''Returns the bytes per object held by the storage after reload'''
+    FileStorage._FileStorage__lazy = lazy
+    FileStorage._FileStorage__objects = {}
+    gc.collect()
+
+    tracemalloc.start()
+    storage.reload()
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return used
+
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as directory:
+        FileStorage._FileStorage__file_path = os.path.join(directory, 'f')
+        FileStorage._FileStorage__objects = {}
+        with storage.batch():
+            for i in range(size):
+                storage.new(Review(text=f'Review {i}', place_id='p',
+                                   user_id='u'))
+
+        built = measure(False)
+        records = measure(True)
+
+    print(f'{size} objects')
+    print(f'built objects   {built / size:8.0f} bytes/object')
+    print(f'compact records {records / size:8.0f} bytes/object '
+          f'({records / built:.0%})')
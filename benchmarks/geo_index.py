@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+'''
+Compares radius and nearest-places queries with GeoIndex
+against a linear scan of the places.
+
+Usage: ./benchmarks/geo_index.py [<size>]
+(100000 places by default)
+'''
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from models.engine.geo_index import GeoIndex, distance  # noqa: E402
+from models.engine.records import pack  # noqa: E402
+from models.place import Place  # noqa: E402
+
+
+def best_of(func, points, repeat=3):
+    '''Returns the best time of func over points, in ms per query'''
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for lat, lon in points:
+            func(lat, lon)
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000 / len(points)
+
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    random.seed(0)
+
+    # places spread over a country-sized area
+    places = []
+    index = GeoIndex()
+    for i in range(size):
+        place = pack(Place, {'id': str(i),
+                             'latitude': random.uniform(28, 36),
+                             'longitude': random.uniform(-13, -1)})
+        places.append(place)
+        index.add(f'Place.{i}', place)
+    points = [(random.uniform(28, 36), random.uniform(-13, -1))
+              for _ in range(20)]
+
+    def scan_within(lat, lon):
+        '''Scans every place for the ones within 10 km'''
+        return sorted((dist, place.id) for place in places
+                      if (dist := distance(lat, lon, place.latitude,
+                                           place.longitude)) <= 10)
+
+    def scan_nearest(lat, lon):
+        '''Scans every place for the 10 nearest'''
+        return sorted((distance(lat, lon, place.latitude, place.longitude),
+                       place.id) for place in places)[:10]
+
+    def index_within(lat, lon):
+        '''Queries the index for the places within 10 km'''
+        return index.within(lat, lon, 10)
+
+    def index_nearest(lat, lon):
+        '''Queries the index for the 10 nearest places'''
+        return index.nearest(lat, lon, 10)
+
+    for lat, lon in points:
+        assert scan_within(lat, lon) == index_within(lat, lon)
+        assert scan_nearest(lat, lon) == index_nearest(lat, lon)
+
+    print(f'{size} places')
+    print(f'within 10 km  scan {best_of(scan_within, points):9.3f} ms'
+          f'  index {best_of(index_within, points):7.3f} ms')
+    print(f'10 nearest    scan {best_of(scan_nearest, points):9.3f} ms'
+          f'  index {best_of(index_nearest, points):7.3f} ms')
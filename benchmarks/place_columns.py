@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+'''
+Compares filtering places by city and price with PlaceColumns
+against a loop over the places.
+
+Usage: ./benchmarks/place_columns.py [<size>]
+(1000000 places by default)
+'''
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from models.engine.place_columns import PlaceColumns  # noqa: E402
+from models.engine.records import pack  # noqa: E402
+from models.place import Place  # noqa: E402
+
+
+def best_of(func, repeat=5):
+    '''Returns the best time of repeat calls to func, in milliseconds'''
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    random.seed(0)
+    cities = [f'city-{i}' for i in range(1000)]
+    wanted = set(cities[:50])
+
+    places = []
+    columns = PlaceColumns()
+    for i in range(size):
+        place = pack(Place, {'id': str(i), 'city_id': random.choice(cities),
+                             'price_by_night': random.randrange(20, 500)})
+        places.append(place)
+        columns.add(f'Place.{i}', place)
+
+    def scan():
+        '''Filters the places one by one'''
+        return [place.id for place in places
+                if place.city_id in wanted and place.price_by_night < 100]
+
+    def query():
+        '''Filters the places with PlaceColumns'''
+        return columns.query(city_ids=wanted, price_max=99)
+
+    assert sorted(scan()) == sorted(query())
+    print(f'{size} places, {len(query())} matches')
+    print(f'loop         {best_of(scan):8.1f} ms')
+    print(f'PlaceColumns {best_of(query):8.1f} ms')
@@ -2,8 +2,10 @@
 '''Console Module'''
 
 import cmd
+import json
 import os
 import sys
+import time
 from models.base_model import BaseModel
 from models import storage
 from models.user import User
@@ -169,6 +171,56 @@ class HBNBCommand(cmd.Cmd):
         print("Creates a class of any type")
         print("[Usage]: create <className>\n")
 
+    def do_bulk_create(self, args):
+        '''Create objects of a class from a JSON Lines file'''
+        args = args.split()
+
+        if not args:
+            print("** class name missing **")
+            return
+        if args[0] not in HBNBCommand.classes:
+            print("** class doesn't exist **")
+            return
+        if len(args) < 2:
+            print("** file name missing **")
+            return
+
+        _cls = HBNBCommand.classes[args[0]]
+
+        def read(f):
+            '''Yields an instance per line of f'''
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    kwargs = json.loads(line)
+                except ValueError:
+                    kwargs = None
+                if type(kwargs) is not dict:
+                    raise ValueError(f"** invalid line {number} **")
+                kwargs.pop('__class__', None)
+                yield _cls(**kwargs)
+
+        start = time.perf_counter()
+        try:
+            with open(args[1], 'r') as f:
+                count = storage.bulk_new(read(f))
+        except OSError:
+            print("** file doesn't exist **")
+            return
+        except ValueError as err:
+            print(err)
+            return
+        elapsed = time.perf_counter() - start
+
+        rate = count / elapsed if elapsed else 0
+        print(f'{count} created in {elapsed:.2f}s ({rate:.0f} rows/s)')
+
+    def help_bulk_create(self):
+        '''Help information for the bulk_create command'''
+        print("Creates an instance of a class per line of a JSON Lines file")
+        print("[Usage]: bulk_create <className> <file.jsonl>\n")
+
     def do_show(self, args):
         '''Method to show an individual object'''
         new = args.partition(" ")
@@ -191,11 +243,11 @@ class HBNBCommand(cmd.Cmd):
             print("** instance id missing **")
             return
 
-        key = c_name + "." + c_id
-        try:
-            print(storage.all()[key])
-        except KeyError:
+        obj = storage.get(HBNBCommand.classes[c_name], c_id)
+        if obj is None:
             print("** no instance found **")
+        else:
+            print(obj)
 
     def help_show(self):
         '''Help information for the show command'''
@@ -222,13 +274,11 @@ class HBNBCommand(cmd.Cmd):
             print("** instance id missing **")
             return
 
-        key = c_name + "." + c_id
-
-        try:
-            obj_to_delete = storage.all()[key]
-            storage.delete(obj_to_delete)
-        except KeyError:
+        obj_to_delete = storage.get(HBNBCommand.classes[c_name], c_id)
+        if obj_to_delete is None:
             print("** no instance found **")
+        else:
+            storage.delete(obj_to_delete)
 
     def help_destroy(self):
         '''Help information for the destroy command'''
@@ -237,21 +287,25 @@ class HBNBCommand(cmd.Cmd):
 
     def do_all(self, args):
         '''Shows all objects, or all objects of a class'''
-        print_list = []
+        cls = None
 
         if args:
             args = args.split(' ')[0]  # remove possible trailing args
             if args not in HBNBCommand.classes:
                 print("** class doesn't exist **")
                 return
-            for k, v in storage.all().items():
-                if k.split('.')[0] == args:
-                    print_list.append(str(v))
-        else:
-            for k, v in storage.all().items():
-                print_list.append(str(v))
-
-        print(print_list)
+            cls = HBNBCommand.classes[args]
+
+        # print the list one object at a time, as print(list) would
+        sep = ''
+        print('[', end='')
+        for obj in storage.iter(cls):
+            # the storage yields the subclasses of cls too
+            if cls and type(obj) is not cls:
+                continue
+            print(sep, repr(str(obj)), sep='', end='')
+            sep = ', '
+        print(']')
 
     def help_all(self):
         '''Help information for the all command'''
@@ -260,16 +314,92 @@ class HBNBCommand(cmd.Cmd):
 
     def do_count(self, args):
         '''Count current number of class instances'''
-        count = 0
-        for k, v in storage.all().items():
-            if args == k.split('.')[0]:
-                count += 1
-        print(count)
+        args = args.partition(' ')[0]
+        if not args:
+            print("** class name missing **")
+            return
+
+        if args not in HBNBCommand.classes:
+            print("** class doesn't exist **")
+            return
+
+        cls = HBNBCommand.classes[args]
+        # the storage counts the subclasses of cls in, which the console
+        # lists under their own names
+        if any(_cls is not cls and issubclass(_cls, cls)
+               for _cls in HBNBCommand.classes.values()):
+            print(sum(1 for obj in storage.iter(cls) if type(obj) is cls))
+        else:
+            print(storage.count(cls))
 
     def help_count(self):
         ''''''
         print("Usage: count <class_name>")
 
+    @staticmethod
+    def parse_point(args):
+        '''Parse the <latitude> <longitude> <number> arguments'''
+        args = args.split()
+
+        if len(args) < 2:
+            print("** coordinates missing **")
+            return None
+        try:
+            lat, lon = float(args[0]), float(args[1])
+        except ValueError:
+            print("** invalid coordinates **")
+            return None
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            print("** invalid coordinates **")
+            return None
+
+        return lat, lon, args[2] if len(args) > 2 else None
+
+    def do_nearby(self, args):
+        '''Shows the places within a radius of a point, nearest first'''
+        point = self.parse_point(args)
+        if point is None:
+            return
+
+        lat, lon, radius = point
+        if radius is None:
+            print("** radius missing **")
+            return
+        try:
+            radius = float(radius)
+        except ValueError:
+            print("** invalid radius **")
+            return
+
+        for dist, _id in storage.geo_index().within(lat, lon, radius):
+            print(f'{_id} {dist:.3f} km')
+
+    def help_nearby(self):
+        '''Help information for the nearby command'''
+        print("Shows the places within a radius in km of a point")
+        print("[Usage]: nearby <latitude> <longitude> <radius_km>\n")
+
+    def do_nearest(self, args):
+        '''Shows the places nearest to a point'''
+        point = self.parse_point(args)
+        if point is None:
+            return
+
+        lat, lon, k = point
+        try:
+            k = int(k) if k is not None else 1
+        except ValueError:
+            print("** invalid count **")
+            return
+
+        for dist, _id in storage.geo_index().nearest(lat, lon, k):
+            print(f'{_id} {dist:.3f} km')
+
+    def help_nearest(self):
+        '''Help information for the nearest command'''
+        print("Shows the <count> places nearest to a point (1 by default)")
+        print("[Usage]: nearest <latitude> <longitude> [<count>]\n")
+
     def do_update(self, args):
         '''Updates a certain object with new info'''
         c_name = c_id = att_name = att_val = kwargs = ''
@@ -293,11 +423,9 @@ class HBNBCommand(cmd.Cmd):
             print("** instance id missing **")
             return
 
-        # generate key from class and id
-        key = c_name + "." + c_id
-
-        # determine if key is present
-        if key not in storage.all():
+        # retrieve the object to update
+        new_dict = storage.get(HBNBCommand.classes[c_name], c_id)
+        if new_dict is None:
             print("** no instance found **")
             return
 
@@ -330,9 +458,6 @@ class HBNBCommand(cmd.Cmd):
 
             args = [att_name, att_val]
 
-        # retrieve dictionary of current objects
-        new_dict = storage.all()[key]
-
         # iterate through attr names and values
         for i, att_name in enumerate(args):
             # block only runs on even iterations
@@ -2,12 +2,17 @@
 '''This module defines a Base class for all models in our hbnb clone'''
 from datetime import datetime
 import models
+from os import getenv
 from sqlalchemy import Column, DateTime, String
 from sqlalchemy.ext.declarative import declarative_base
 import uuid
+from weakref import WeakKeyDictionary
 
 Base = declarative_base()
 
+# to_dict() timestamp strings by instance, valid while the datetimes last
+_iso_cache = WeakKeyDictionary()
+
 
 class BaseModel:
     '''A Base class for all hbnb models'''
@@ -18,6 +23,13 @@ class BaseModel:
                         default=datetime.utcnow(),
                         onupdate=datetime.utcnow())
 
+    if getenv('HBNB_TYPE_STORAGE') != 'db':
+        def __setattr__(self, name, value):
+            '''Sets the attribute and tells the storage the object changed'''
+            super().__setattr__(name, value)
+            if name != '_sa_instance_state':
+                models.storage.changed(self)
+
     def __init__(self, *args, **kwargs):
         '''Instatntiates a new model'''
         if not kwargs:
@@ -29,23 +41,31 @@ class BaseModel:
             if 'id' not in kwargs:
                 self.id = str(uuid.uuid4())
 
-            dt_format = '%Y-%m-%dT%H:%M:%S.%f'
-
-            if 'created_at' in kwargs:
-                kwargs['created_at'] = datetime.strptime(kwargs['created_at'],
-                                                         dt_format)
-            else:
+            if 'created_at' not in kwargs:
                 self.created_at = datetime.now()
+            elif isinstance(kwargs['created_at'], str):
+                kwargs['created_at'] = self.parse_datetime(
+                                                kwargs['created_at'])
 
-            if 'updated_at' in kwargs:
-                kwargs['updated_at'] = datetime.strptime(kwargs['updated_at'],
-                                                         dt_format)
-            else:
+            if 'updated_at' not in kwargs:
                 self.updated_at = datetime.now()
+            elif isinstance(kwargs['updated_at'], str):
+                kwargs['updated_at'] = self.parse_datetime(
+                                                kwargs['updated_at'])
 
+            # not stored yet: the storage need not hear of these
+            set_attr = super().__setattr__
             for key, value in kwargs.items():
                 if key != '__class__':
-                    setattr(self, key, value)
+                    set_attr(key, value)
+
+    @staticmethod
+    def parse_datetime(value):
+        '''Parses an ISO 8601 timestamp, or one in the legacy format'''
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%f')
 
     def __str__(self):
         '''Returns a string representation of the instance'''
@@ -64,8 +84,17 @@ class BaseModel:
         dictionary.update(self.__dict__)
         dictionary.update({'__class__':
                           (str(type(self)).split('.')[-1]).split('\'')[0]})
-        dictionary['created_at'] = self.created_at.isoformat()
-        dictionary['updated_at'] = self.updated_at.isoformat()
+
+        created_at, updated_at = self.created_at, self.updated_at
+        cached = _iso_cache.get(self)
+        if cached and cached[0] is created_at and cached[1] is updated_at:
+            dictionary['created_at'], dictionary['updated_at'] = cached[2:]
+        else:
+            dictionary['created_at'] = created_at.isoformat()
+            dictionary['updated_at'] = updated_at.isoformat()
+            _iso_cache[self] = (created_at, updated_at,
+                                dictionary['created_at'],
+                                dictionary['updated_at'])
 
         if '_sa_instance_state' in dictionary:
             del dictionary['_sa_instance_state']
@@ -73,5 +102,5 @@ class BaseModel:
         return dictionary
 
     def delete(self):
-        '''Delete the current instance from the storage'''
+        '''Delete the current instance from the storage'''
         models.storage.delete(self)
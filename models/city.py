@@ -1,5 +1,6 @@
 #!/usr/bin/python3
 ''' City Module for HBNB project '''
+from models import storage
 from models.base_model import BaseModel, Base
 from sqlalchemy import Column, ForeignKey, String
 from sqlalchemy.orm import relationship
@@ -14,8 +15,14 @@ class City(BaseModel, Base):
         name = Column(String(128), nullable=False)
         state_id = Column(String(60),
                           ForeignKey('states.id', ondelete='CASCADE'),
-                          nullable=False)
+                          nullable=False, index=True)
         places = relationship("Place", backref="cities", cascade="all, delete")
     else:
         name = ''
         state_id = ''
+
+        @property
+        def places(self):
+            '''Retrieve all places located in this city'''
+            from models.place import Place
+            return storage.related(Place, 'city_id', self.id)
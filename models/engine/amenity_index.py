@@ -0,0 +1,69 @@
+#!/usr/bin/python3
+'''This module defines an index of places by amenity'''
+from models.engine.records import field
+from models.place import Place
+
+
+class AmenityIndex:
+    '''
+    Keeps the set of ids of the places linked to each amenity,
+    so that amenity filters are set intersections and unions
+    '''
+    model = Place
+
+    def __init__(self):
+        '''Creates an empty index'''
+        self.__places = {}
+        self.__links = {}
+
+    def __len__(self):
+        '''Returns the number of places in the index'''
+        return len(self.__links)
+
+    def add(self, key, obj):
+        '''Stores the amenity links of the place obj stored under key'''
+        self.remove(key)
+
+        place_id = field(obj, 'id')
+        amenity_ids = frozenset(field(obj, 'amenity_ids') or ())
+        for amenity_id in amenity_ids:
+            self.__places.setdefault(amenity_id, set()).add(place_id)
+        self.__links[key] = (place_id, amenity_ids)
+
+    def remove(self, key):
+        '''Drops the amenity links of the place stored under key'''
+        place_id, amenity_ids = self.__links.pop(key, (None, ()))
+
+        for amenity_id in amenity_ids:
+            places = self.__places[amenity_id]
+            places.discard(place_id)
+            if not places:
+                del self.__places[amenity_id]
+
+    def clear(self):
+        '''Drops every place'''
+        self.__places = {}
+        self.__links = {}
+
+    def query(self, all_of=(), any_of=()):
+        '''
+        Returns the set of ids of the places linked to every amenity id
+        of all_of and to at least one of any_of; empty filters are skipped
+        '''
+        result = None
+
+        if all_of:
+            sets = sorted((self.__places.get(amenity_id, set())
+                           for amenity_id in set(all_of)), key=len)
+            result = sets[0].intersection(*sets[1:])
+        if any_of:
+            sets = [self.__places.get(amenity_id, set())
+                    for amenity_id in set(any_of)]
+            if result is None:
+                result = set().union(*sets)
+            else:
+                result = {place_id for place_id in result
+                          if any(place_id in places for places in sets)}
+        if result is None:
+            result = {place_id for place_id, _ in self.__links.values()}
+        return result
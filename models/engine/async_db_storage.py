@@ -0,0 +1,172 @@
+#!/usr/bin/python3
+'''This module defines a class to manage asyncio database storage'''
+import asyncio
+from os import getenv
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import (async_scoped_session, async_sessionmaker,
+                                    create_async_engine)
+from models.engine import migrations
+from models.engine.db_storage import load_options, mapped_models
+
+
+class AsyncDBStorage:
+    '''
+    This class manages database storage of hbnb models from asyncio code,
+    on SQLAlchemy's async engine: reload(), migrate(), save(), delete(),
+    all(), get() and count() are coroutines and iter() an async generator,
+    while new() only adds to the session. The application creates its own
+    instance, the models being mapped with HBNB_TYPE_STORAGE=db
+    '''
+    __engine = None
+    # registry of the sessions, one per task until close() removes it
+    __session = None
+    # connection pool settings, by the environment variable setting them
+    __pool_settings = {
+                        'pool_size': 'HBNB_DB_POOL_SIZE',
+                        'max_overflow': 'HBNB_DB_MAX_OVERFLOW',
+                        'pool_recycle': 'HBNB_DB_POOL_RECYCLE',
+                        'pool_timeout': 'HBNB_DB_POOL_TIMEOUT'
+                      }
+
+    def __init__(self):
+        '''
+        Create the async engine, on HBNB_DB_ASYNC_URL or else the MySQL
+        database of the HBNB_MYSQL_* variables through aiomysql
+        '''
+        USER = getenv('HBNB_MYSQL_USER')
+        PWD = getenv('HBNB_MYSQL_PWD')
+        HOST = getenv('HBNB_MYSQL_HOST')
+        DB = getenv('HBNB_MYSQL_DB')
+
+        pool_options = {option: int(getenv(name)) for option, name
+                        in self.__pool_settings.items() if getenv(name)}
+
+        db_link = getenv('HBNB_DB_ASYNC_URL',
+                         f'mysql+aiomysql://{USER}:{PWD}@{HOST}:3306/{DB}')
+        self.__engine = create_async_engine(db_link, pool_pre_ping=True,
+                                            **pool_options)
+
+        # objects stay readable after a commit, instead of being expired
+        # and reloaded on their next attribute read, which async cannot do
+        factory = async_sessionmaker(bind=self.__engine,
+                                     expire_on_commit=False)
+        self.__session = async_scoped_session(
+            factory, scopefunc=asyncio.current_task)
+
+    def new(self, obj=None):
+        '''Add the object to the current task's session'''
+        if obj:
+            self.__session.add(obj)
+
+    async def save(self):
+        '''Commit all changes of the current task's session'''
+        await self.__session.commit()
+
+    async def delete(self, obj=None):
+        '''Delete a record from the current task's session and commit'''
+        if obj:
+            await self.__session.delete(obj)
+            await self.save()
+
+    async def all(self, cls=None, load=None):
+        '''
+        Query all objects, or a specific class's objects, eagerly loading
+        the relationships of cls named by load: relationships are not
+        loaded lazily from async code; a cls with no table has no objects
+        '''
+        objs_dict = {}
+
+        tables = mapped_models()
+
+        options = []
+        if cls:
+            tables = [cls] if cls in tables else []
+            options = load_options(cls, load)
+        for t_name in tables:
+            objs = await self.__session.scalars(
+                select(t_name).options(*options))
+            for obj in objs:
+                objs_dict[f'{obj.__class__.__name__}.{obj.id}'] = obj
+
+        return objs_dict
+
+    async def get(self, cls, id, load=None):
+        '''
+        Return the cls object with this id, or None if there is none or
+        cls has no table, eagerly loading the relationships named by load
+        '''
+        if cls not in mapped_models():
+            return None
+        return await self.__session.get(cls, id,
+                                        options=load_options(cls, load))
+
+    async def count(self, cls=None):
+        '''
+        Count with SQL the objects, or a specific class's objects: none
+        if it has no table
+        '''
+        tables = mapped_models()
+
+        if cls:
+            if cls not in tables:
+                return 0
+            tables = [cls]
+        counts = (await self.__session.execute(select(*(
+            select(func.count()).select_from(t_name).scalar_subquery()
+            for t_name in tables)))).one()
+        return sum(counts)
+
+    async def iter(self, cls=None, batch_size=1000, where=None, load=None):
+        '''
+        Yield the objects of the database, or a specific class's objects,
+        whose attributes equal the values of the dict where, streamed
+        batch_size rows at a time, for async for; a cls with no table has
+        no objects
+        '''
+        tables = mapped_models()
+
+        options = []
+        if cls:
+            tables = [cls] if cls in tables else []
+            options = load_options(cls, load)
+        for t_name in tables:
+            query = select(t_name).options(*options).execution_options(
+                yield_per=batch_size)
+            if where:
+                query = query.filter_by(**where)
+            async for obj in await self.__session.stream_scalars(query):
+                yield obj
+
+    async def reload(self):
+        '''
+        Migrate the database schema unless its recorded version is the
+        latest already, dropping it with its version first if testing;
+        awaited once at startup
+        '''
+        if getenv('HBNB_ENV') == 'test':
+            async with self.__engine.begin() as conn:
+                await conn.run_sync(migrations.drop)
+
+        async with self.__engine.connect() as conn:
+            version = await conn.run_sync(migrations.current_version)
+        if version != migrations.LATEST:
+            await self.migrate()
+
+    async def migrate(self):
+        '''
+        Bring the database schema to the latest version, creating it if
+        there is none, and return the versions applied
+        '''
+        async with self.__engine.begin() as conn:
+            return await conn.run_sync(migrations.migrate)
+
+    async def close(self):
+        '''
+        End the current task's session, returning its connection to the
+        pool; the next call of the task starts a new one
+        '''
+        await self.__session.remove()
+
+    async def dispose(self):
+        '''Close every connection of the pool, before the loop stops'''
+        await self.__engine.dispose()
@@ -1,68 +1,249 @@
 #!/usr/bin/python3
 '''This module defines a class to manage database storage for hbnb clone'''
+import gc
+import threading
+import time
+from contextlib import contextmanager
+from itertools import islice
 from os import getenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy import (create_engine, delete, event, func, insert, inspect,
+                        make_url, select)
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import (Session, joinedload, make_transient_to_detached,
+                            selectinload, sessionmaker, scoped_session)
 from models.base_model import Base
+from models.engine import migrations
+
+
+# eager loading strategies of the load argument
+_loaders = {'selectin': selectinload, 'joined': joinedload}
+
+
+def mapped_models():
+    '''Returns the mapped model classes'''
+    from models.user import User
+    from models.place import Place
+    from models.state import State
+    from models.city import City
+    from models.amenity import Amenity
+    from models.review import Review
+
+    return [State, City, User, Place, Review, Amenity]
+
+
+def load_options(cls, load):
+    '''
+    Returns the loader options of load: relationship paths from cls
+    such as 'cities.places', loaded with one SELECT ... IN query
+    per relationship, or a dict of them to 'selectin' or 'joined',
+    the latter loading them in the query of their parent with a JOIN
+    '''
+    if not load:
+        return []
+    if not isinstance(load, dict):
+        load = dict.fromkeys(load, 'selectin')
+
+    options = []
+    for path, strategy in load.items():
+        if strategy not in _loaders:
+            raise ValueError(f'unknown loading strategy {strategy!r}')
+        option, model = None, cls
+        for name in path.split('.'):
+            attribute = getattr(model, name)
+            if option is None:
+                option = _loaders[strategy](attribute)
+            elif strategy == 'joined':
+                option = option.joinedload(attribute)
+            else:
+                option = option.selectinload(attribute)
+            model = attribute.property.mapper.class_
+        options.append(option)
+    return options
+
+
+class _ThreadState(threading.local):
+    '''The batch() nesting of each thread'''
+    batch_depth = 0
+
+
+class _RoutingSession(Session):
+    '''A session running each statement on the engine route() picks'''
+
+    def __init__(self, route, **kwargs):
+        '''Creates a session asking route(session, clause) for engines'''
+        super().__init__(**kwargs)
+        self.__route = route
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        '''Returns the engine to run clause on'''
+        return self.__route(self, clause)
 
 
 class DBStorage:
     '''This class manages database storage of hbnb models in MySQL DB'''
     __engine = None
+    # registry of the sessions, one per thread until close() removes it
     __session = None
+    # rows per multi-row INSERT of bulk_new()
+    __chunk_size = int(getenv('HBNB_BULK_CHUNK', 1000))
+    # bounded mode: a session drops the objects it holds once it loaded
+    # HBNB_DB_CACHE_MAX of them, or HBNB_DB_CACHE_TTL seconds after the
+    # last drop, checked when objects are next read
+    __cache_max = int(getenv('HBNB_DB_CACHE_MAX', 0))
+    __cache_ttl = float(getenv('HBNB_DB_CACHE_TTL', 0))
+    # run on each new SQLite connection, see __on_sqlite_connect()
+    __sqlite_pragmas = ('journal_mode=WAL', 'synchronous=NORMAL',
+                        'cache_size=-65536', 'busy_timeout=5000',
+                        'foreign_keys=ON')
+    # seconds a replica is skipped for after failing to connect
+    __replica_retry = float(getenv('HBNB_DB_REPLICA_RETRY', 30))
+    # connection pool settings, by the environment variable setting them
+    __pool_settings = {
+                        'pool_size': 'HBNB_DB_POOL_SIZE',
+                        'max_overflow': 'HBNB_DB_MAX_OVERFLOW',
+                        'pool_recycle': 'HBNB_DB_POOL_RECYCLE',
+                        'pool_timeout': 'HBNB_DB_POOL_TIMEOUT'
+                      }
 
     def __init__(self):
-        '''Create DBStorage engine and drop tables if testing'''
+        '''
+        Create DBStorage engine, on HBNB_DB_URL or else the MySQL database
+        of the HBNB_MYSQL_* variables, and one per read replica of the
+        comma-separated HBNB_DB_REPLICA_URLS, and drop tables if testing
+        '''
         USER = getenv('HBNB_MYSQL_USER')
         PWD = getenv('HBNB_MYSQL_PWD')
         HOST = getenv('HBNB_MYSQL_HOST')
         DB = getenv('HBNB_MYSQL_DB')
 
-        db_link = f'mysql+mysqldb://{USER}:{PWD}@{HOST}:3306/{DB}'
-        self.__engine = create_engine(db_link, pool_pre_ping=True)
+        self.__thread = _ThreadState()
+        self.__lock = threading.Lock()
+        self.__pool_lock = threading.Lock()
+        # side indexes, fed the objects of each session on commit
+        self.__observers = []
+        # connection checkouts from the pools, and the most in use at once
+        self.__checkouts = 0
+        self.__checked_out = 0
+        self.__peak = 0
+
+        db_link = getenv('HBNB_DB_URL',
+                         f'mysql+mysqldb://{USER}:{PWD}@{HOST}:3306/{DB}')
+        self.__engine = self.__connect(db_link)
+        self.__replicas = [self.__connect(url.strip()) for url
+                           in getenv('HBNB_DB_REPLICA_URLS', '').split(',')
+                           if url.strip()]
+        # the replica the next session reads from, and the replicas
+        # failing to connect by the time they are retried at
+        self.__turn = 0
+        self.__down_until = {}
 
         if getenv('HBNB_ENV') == 'test':
-            Base.metadata.drop_all(bind=self.__engine)
+            with self.__engine.begin() as conn:
+                migrations.drop(conn)
 
     def new(self, obj=None):
         '''Add the object to the current database session'''
         if obj:
-            self.__session.add(obj)
+            self.__session.add(self.__attach(obj))
 
     def save(self):
-        '''Commit all the changes of the current database session'''
-        self.__session.commit()
+        '''
+        Commit all the changes of the current database session,
+        unless inside a batch() block, or roll them back if it fails
+        '''
+        if self.__thread.batch_depth:
+            return
+        try:
+            self.__session.commit()
+        except BaseException:
+            self.__session.rollback()
+            raise
+
+    @contextmanager
+    def batch(self):
+        '''
+        Defer every commit made inside the block to a single transaction
+        committed on exit, or rolled back if the block raises
+        '''
+        self.__thread.batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self.__thread.batch_depth -= 1
+            if not self.__thread.batch_depth:
+                self.__session.rollback()
+            raise
+        self.__thread.batch_depth -= 1
+        self.save()
+
+    def bulk_new(self, objs, chunk_size=None):
+        '''
+        Insert the objects of the iterable objs with multi-row INSERTs of
+        chunk_size rows, in one transaction, and return how many there were;
+        the objects join the session as stored ones, to be saved or deleted
+        later, and an object must come in the same chunk as, or after, the
+        objects it refers to
+        '''
+        chunk_size = chunk_size or self.__chunk_size
+        tables = Base.metadata.sorted_tables
+        objs = iter(objs)
+        count = 0
+
+        with self.batch():
+            while True:
+                chunk = list(islice(objs, chunk_size))
+                if not chunk:
+                    break
+
+                groups = {}
+                for obj in chunk:
+                    groups.setdefault(type(obj), []).append(obj)
+                for _cls in sorted(groups,
+                                   key=lambda c: tables.index(c.__table__)):
+                    rows = [self.__row(obj) for obj in groups[_cls]]
+                    self.__session.execute(insert(_cls.__table__), rows)
+                # their rows are in: attach them as persistent, which a
+                # later save() updates instead of inserting them again
+                for obj in chunk:
+                    make_transient_to_detached(obj)
+                    self.__session.add(obj)
+
+                if self.__observers:
+                    pending = self.__session.info.setdefault('pending', {})
+                    for obj in chunk:
+                        key = f'{type(obj).__name__}.{obj.id}'
+                        pending[key] = (obj, True)
+                count += len(chunk)
+        return count
 
     def delete(self, obj=None):
         '''Delete a record from the current database session'''
 
         if obj:
-            self.__session.delete(obj)
+            self.__session.delete(self.__attach(obj))
             self.save()
 
-    def all(self, cls=None):
+    def all(self, cls=None, load=None):
         '''
         Query on the current database session all objects,
-        or a specific class's objects depending of the class name
+        or a specific class's objects depending of the class name,
+        eagerly loading the relationships of cls named by load; a cls
+        with no table has no objects
         '''
-        from models.user import User
-        from models.place import Place
-        from models.state import State
-        from models.city import City
-        from models.amenity import Amenity
-        from models.review import Review
-
+        self.__trim()
         objs_dict = {}
 
         engine = self.__engine
         session = self.__session
 
-        tables = [State, City, User, Place, Review, Amenity]
+        tables = mapped_models()
 
+        options = []
         if cls:
-            tables = [cls]
+            tables = [cls] if cls in tables else []
+            options = load_options(cls, load)
         for t_name in tables:
-            objs = session.query(t_name).all()
+            objs = session.query(t_name).options(*options).all()
             for obj in objs:
                 _cl = obj.__class__.__name__
                 _id = obj.id
@@ -70,12 +251,61 @@ class DBStorage:
 
         return objs_dict
 
+    def get(self, cls, id, load=None):
+        '''
+        Return the cls object with this id, or None if there is none or
+        cls has no table, from the identity map or else by primary key,
+        eagerly loading the relationships named by load
+        '''
+        if cls not in mapped_models():
+            return None
+        self.__trim()
+        return self.__session.get(cls, id,
+                                  options=load_options(cls, load))
+
+    def count(self, cls=None):
+        '''
+        Count with SQL the objects of the database,
+        or a specific class's objects: none if it has no table
+        '''
+        tables = mapped_models()
+
+        if cls:
+            if cls not in tables:
+                return 0
+            tables = [cls]
+        counts = self.__session.execute(select(*(
+            select(func.count()).select_from(t_name).scalar_subquery()
+            for t_name in tables))).one()
+        return sum(counts)
+
+    def iter(self, cls=None, batch_size=1000, where=None, load=None):
+        '''
+        Yield the objects of the database, or a specific class's objects,
+        whose attributes equal the values of the dict where, fetched from
+        a server-side cursor batch_size rows at a time; the relationships
+        of cls named by load are loaded a batch at a time, and a cls with
+        no table has no objects
+        '''
+        self.__trim()
+        tables = mapped_models()
+
+        options = []
+        if cls:
+            tables = [cls] if cls in tables else []
+            options = load_options(cls, load)
+        for t_name in tables:
+            query = select(t_name).options(*options).execution_options(
+                yield_per=batch_size)
+            if where:
+                query = query.filter_by(**where)
+            yield from self.__session.scalars(query)
+
     def reload(self):
         '''
-        Create all the tables in the database,
-        then create the current database session
+        Migrate the database schema unless its recorded version is the
+        latest already, then create the current database session
         '''
-        from models.base_model import Base
         from models.user import User
         from models.place import Place
         from models.state import State
@@ -83,8 +313,305 @@ class DBStorage:
         from models.amenity import Amenity
         from models.review import Review
 
-        Base.metadata.create_all(self.__engine)
+        with self.__engine.connect() as conn:
+            version = migrations.current_version(conn)
+        if version != migrations.LATEST:
+            self.migrate()
+
+        if self.__replicas:
+            factory = sessionmaker(bind=self.__engine,
+                                   expire_on_commit=False,
+                                   class_=_RoutingSession,
+                                   route=self.__route)
+        else:
+            factory = sessionmaker(bind=self.__engine,
+                                   expire_on_commit=False)
+        event.listen(factory, 'after_flush', self.__collect)
+        event.listen(factory, 'after_commit', self.__notify)
+        event.listen(factory, 'after_rollback', self.__forget)
+        event.listen(factory, 'loaded_as_persistent', self.__on_load)
+        self.__session = scoped_session(factory)
+
+    def create_indexes(self):
+        '''
+        Create the indexes of the models missing from the database, as in
+        one created before they were declared, and return their names
+        '''
+        with self.__engine.begin() as conn:
+            return migrations.create_indexes(conn)
+
+    def migrate(self):
+        '''
+        Bring the database schema to the latest version, creating it if
+        there is none, and return the versions applied
+        '''
+        with self.__engine.begin() as conn:
+            return migrations.migrate(conn)
+
+    def close(self):
+        '''
+        Close the session of the current thread, giving its connection
+        back to the pool; the thread gets a new session on next use
+        '''
+        self.__session.remove()
+
+    def clear_cache(self):
+        '''
+        Flush the changes of the current thread's session, then run a full
+        garbage collection: the identity map holds the flushed objects
+        weakly, so the objects nothing else refers to any more, such as
+        those only linked to each other by loaded relationships, leave it;
+        the objects still in use stay attached and go on loading their
+        relationships lazily
+        '''
+        session = self.__session()
+        session.flush()
+        gc.collect()
+        session.info['loads'] = 0
+        session.info['cleared_at'] = time.monotonic()
+
+    def pool_stats(self):
+        '''
+        Return the connection pool counters: checkouts since start,
+        connections checked out now and at most, and the pool status
+        '''
+        with self.__pool_lock:
+            return {
+                    'checkouts': self.__checkouts,
+                    'checked_out': self.__checked_out,
+                    'peak_checked_out': self.__peak,
+                    'status': self.__engine.pool.status()
+                   }
+
+    def observe(self, observer):
+        '''
+        Keeps observer in sync with the objects of observer.model: its
+        add(key, obj) gets every object committed and its remove(key)
+        every object deleted
+        '''
+        with self.__lock:
+            self.__observers.append(observer)
+            for key, obj in self.all(observer.model).items():
+                observer.add(key, obj)
+        return observer
+
+    def geo_index(self):
+        '''Returns the GeoIndex of the stored places'''
+        from models.engine.geo_index import GeoIndex
+
+        for observer in self.__observers:
+            if type(observer) is GeoIndex:
+                return observer
+        return self.observe(GeoIndex())
+
+    def link_amenities(self, place, amenity_ids):
+        '''
+        Links place to the amenities of amenity_ids it is not linked to yet
+        in one insert and commits; inside a batch() block the commit is
+        deferred too
+        '''
+        from models.place import place_amenity
+
+        session = self.__session
+        # the links to insert are decided on the primary
+        session.info['wrote'] = True
+        linked = set(session.scalars(
+            select(place_amenity.c.amenity_id)
+            .where(place_amenity.c.place_id == place.id)))
+        rows = [{'place_id': place.id, 'amenity_id': amenity_id}
+                for amenity_id in dict.fromkeys(amenity_ids)
+                if amenity_id not in linked]
+        if rows:
+            session.execute(insert(place_amenity), rows)
+            session.expire(place, ['amenities'])
+        self.save()
+
+    def unlink_amenities(self, place, amenity_ids):
+        '''
+        Unlinks place from the amenities of amenity_ids in one delete and
+        commits; inside a batch() block the commit is deferred too
+        '''
+        from models.place import place_amenity
+
+        session = self.__session
+        session.info['wrote'] = True
+        # the links pending in place.amenities are flushed first, so that
+        # none of them comes back in at the next flush
+        session.flush()
+        session.execute(
+            delete(place_amenity)
+            .where(place_amenity.c.place_id == place.id)
+            .where(place_amenity.c.amenity_id.in_(set(amenity_ids))))
+        session.expire(place, ['amenities'])
+        self.save()
+
+    def places_with_amenities(self, all_of=(), any_of=()):
+        '''
+        Returns the list of places linked to every amenity id of all_of
+        and to at least one of any_of
+        '''
+        from models.place import Place, place_amenity
+
+        query = self.__session.query(Place)
+        amenity_id = place_amenity.c.amenity_id
+        if all_of:
+            all_of = set(all_of)
+            linked = select(place_amenity.c.place_id)\
+                .where(amenity_id.in_(all_of))\
+                .group_by(place_amenity.c.place_id)\
+                .having(func.count(amenity_id) == len(all_of))
+            query = query.filter(Place.id.in_(linked))
+        if any_of:
+            linked = select(place_amenity.c.place_id)\
+                .where(amenity_id.in_(set(any_of)))
+            query = query.filter(Place.id.in_(linked))
+        return query.all()
+
+    def __collect(self, session, flush_context):
+        '''Records the objects flushed, to pass them on at commit'''
+        if not self.__observers:
+            return
+
+        pending = session.info.setdefault('pending', {})
+        for obj in session.new | session.dirty:
+            pending[f'{type(obj).__name__}.{obj.id}'] = (obj, True)
+        for obj in session.deleted:
+            pending[f'{type(obj).__name__}.{obj.id}'] = (obj, False)
+
+    def __notify(self, session):
+        '''Passes the objects committed on to the observers'''
+        pending = session.info.pop('pending', {})
+
+        with self.__lock:
+            for key, (obj, alive) in pending.items():
+                for observer in self.__observers:
+                    if observer.model is not type(obj):
+                        continue
+                    if alive:
+                        observer.add(key, obj)
+                    else:
+                        observer.remove(key)
+
+    def __forget(self, session):
+        '''Drops the objects flushed by a transaction rolled back'''
+        session.info.pop('pending', None)
+
+    def __on_load(self, session, instance):
+        '''Counts an object loaded by session'''
+        session.info['loads'] = session.info.get('loads', 0) + 1
+
+    def __trim(self):
+        '''Clears the cache of the current session if it is over bounds'''
+        if not (self.__cache_max or self.__cache_ttl) or \
+                self.__thread.batch_depth:
+            return
+
+        info = self.__session.info
+        now = time.monotonic()
+        cleared_at = info.setdefault('cleared_at', now)
+        if self.__cache_max and info.get('loads', 0) >= self.__cache_max or \
+                self.__cache_ttl and now - cleared_at >= self.__cache_ttl:
+            self.clear_cache()
+
+    def __attach(self, obj):
+        '''
+        Returns obj, or the copy of the session it was merged into if
+        clear_cache() dropped it and the session loaded its row again
+        '''
+        state = inspect(obj)
+        if state.detached and state.key in self.__session.identity_map:
+            return self.__session.merge(obj)
+        return obj
+
+    def __connect(self, url):
+        '''Returns an engine on url, with the pool settings'''
+        url = make_url(url)
+        sqlite = url.get_backend_name() == 'sqlite'
+
+        # an in-memory SQLite database lives in a single connection,
+        # kept by a pool which has no size to set
+        pool_options = {}
+        if not sqlite or url.database not in (None, '', ':memory:'):
+            pool_options = {option: int(getenv(name)) for option, name
+                            in self.__pool_settings.items() if getenv(name)}
+
+        engine = create_engine(url, pool_pre_ping=True, **pool_options)
+        if sqlite:
+            event.listen(engine, 'connect', self.__on_sqlite_connect)
+        event.listen(engine, 'checkout', self.__on_checkout)
+        event.listen(engine, 'checkin', self.__on_checkin)
+        return engine
+
+    def __route(self, session, clause):
+        '''
+        Returns the engine to run clause on in session: the primary for
+        anything but a SELECT, flushes and text() statements included,
+        and for everything after a session's first write, so it reads
+        them back, else the replica the session reads from, picked in
+        turn among those whose pool connects, pinging the database; and
+        the primary if none does
+        '''
+        if clause is None or not clause.is_select:
+            session.info['wrote'] = True
+        if session.info.get('wrote'):
+            return self.__engine
+
+        replica = session.info.get('replica')
+        if replica is None:
+            with self.__pool_lock:
+                turn = self.__turn % len(self.__replicas)
+                self.__turn += 1
+            replicas = self.__replicas[turn:] + self.__replicas[:turn]
+        else:
+            replicas = [replica] + [other for other in self.__replicas
+                                    if other is not replica]
+
+        now = time.monotonic()
+        for replica in replicas:
+            if self.__down_until.get(replica, 0) > now:
+                continue
+            try:
+                # a no-op once the transaction has a connection to it
+                session.connection(bind_arguments={'bind': replica})
+            except DBAPIError:
+                self.__down_until[replica] = now + self.__replica_retry
+                continue
+            session.info['replica'] = replica
+            return replica
+        return self.__engine
+
+    def __on_sqlite_connect(self, dbapi_connection, record):
+        '''
+        Sets up a new SQLite connection: write-ahead logging, so readers
+        do not block the writer, syncing to disk at checkpoints only,
+        a 64 MiB page cache, waiting up to 5 s on a lock, and enforcing
+        foreign keys, which SQLite ignores by default
+        '''
+        cursor = dbapi_connection.cursor()
+        for pragma in self.__sqlite_pragmas:
+            cursor.execute(f'PRAGMA {pragma}')
+        cursor.close()
+
+    def __on_checkout(self, dbapi_connection, record, proxy):
+        '''Counts a connection checked out from the pool'''
+        with self.__pool_lock:
+            self.__checkouts += 1
+            self.__checked_out += 1
+            self.__peak = max(self.__peak, self.__checked_out)
+
+    def __on_checkin(self, dbapi_connection, record):
+        '''Counts a connection given back to the pool'''
+        with self.__pool_lock:
+            self.__checked_out -= 1
+
+    def __row(self, obj):
+        '''Returns the column values of obj, defaults filled in'''
+        row = {}
 
-        ScopedSession = scoped_session(sessionmaker(bind=self.__engine,
-                                                    expire_on_commit=False))
-        self.__session = ScopedSession()
+        for column in obj.__table__.columns:
+            value = getattr(obj, column.key)
+            if value is None and column.default is not None and \
+                    column.default.is_scalar:
+                value = column.default.arg
+            row[column.key] = value
+        return row
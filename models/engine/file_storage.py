@@ -1,65 +1,658 @@
 #!/usr/bin/python3
 '''This module defines a class to manage file storage for hbnb clone'''
-import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from itertools import chain
+from os import getenv
+from models.engine.records import Record, field, pack
+from models.engine.serializers import serializers
+
+
+class _ThreadState(threading.local):
+    '''The batch() nesting of each thread'''
+    batch_depth = 0
 
 
 class FileStorage:
-    '''This class manages file storage of hbnb models in JSON format'''
+    '''
+    This class manages file storage of hbnb models in JSON format,
+    or in the format named by HBNB_FILE_FORMAT
+    '''
     __file_path = 'file.json'
     __objects = {}
+    __serializer = serializers[getenv('HBNB_FILE_FORMAT', 'json')]()
+    # per-class buckets of __objects, built from the dict in __indexed
+    __buckets = {}
+    __indexed = None
+    # lazy mode keeps the reloaded records as compact Records, bucketed
+    # per class like __objects, until something asks for their objects
+    __lazy = getenv('HBNB_FILE_LAZY') == '1'
+    __raw = {}
+    __classes = None
+    # foreign keys reverse-indexed for the relationship properties
+    __relations = {
+                    'City': ('state_id',),
+                    'Place': ('city_id', 'user_id'),
+                    'Review': ('place_id', 'user_id')
+                  }
+    __related = {}
+    __fk_values = {}
+    # side indexes kept in sync with the objects of their model class
+    __observers = []
+    # journal mode appends each mutation to a log instead of rewriting
+    # the file; the log is folded into the file past __journal_max bytes
+    __journal = getenv('HBNB_FILE_JOURNAL') == '1'
+    __journal_max = int(getenv('HBNB_FILE_JOURNAL_MAX', 1024 * 1024))
+    # keys changed since the last save, and the encoding of the clean ones
+    __dirty = set()
+    __encoded = {}
+    # the saves of a thread are deferred while it is in a batch() block
+    __thread = _ThreadState()
+    # serializes writers, so saves can also run from a flush thread
+    __lock = threading.RLock()
+
+    def all(self, cls=None, load=None):
+        '''
+        Returns a dictionary of models currently in storage, or a copy
+        of the objects of a specific class, read from its bucket in time
+        proportional to their number; load only matters to DBStorage
+        '''
+        if not cls:
+            self.__materialize(object)
+            return FileStorage.__objects
+
+        self.__materialize(cls)
+        buckets = [bucket for _cls, bucket in
+                   FileStorage.__buckets.items() if issubclass(_cls, cls)]
+        filtered_dict = {}
+        for bucket in buckets:
+            filtered_dict.update(bucket)
+        return filtered_dict
+
+    def get(self, cls, id, load=None):
+        '''
+        Returns the cls object with this id, or None if there is none;
+        load only matters to DBStorage
+        '''
+        key = f'{cls.__name__}.{id}'
 
-    def all(self, cls=None):
-        '''Returns a dictionary of models currently in storage'''
-        dict_objs = FileStorage.__objects
+        with FileStorage.__lock:
+            self.__sync()
+            obj = FileStorage.__objects.get(key)
+            if obj is None:
+                raw = self.__find_raw(key)
+                if raw is not None:
+                    obj = self.__build(key, raw)
+            return obj
 
-        if cls:
-            filtered_dict = {key: obj for key, obj in dict_objs.items()
-                             if isinstance(obj, cls)}
-            return filtered_dict
+    def count(self, cls=None):
+        '''
+        Returns the number of objects in storage, or of the objects of a
+        specific class, without building the records of lazy mode
+        '''
+        with FileStorage.__lock:
+            self.__sync()
+            if not cls:
+                return len(FileStorage.__objects) + \
+                    sum(len(raw) for raw in FileStorage.__raw.values())
 
-        return dict_objs
+            return sum(len(bucket)
+                       for buckets in (FileStorage.__buckets,
+                                       FileStorage.__raw)
+                       for _cls, bucket in buckets.items()
+                       if issubclass(_cls, cls))
+
+    def iter(self, cls=None, batch_size=1000, where=None, load=None):
+        '''
+        Yields the objects in storage, or the objects of a specific class,
+        whose attributes equal the values of the dict where; records of
+        lazy mode are built one at a time and only kept once changed or
+        deleted, and batch_size and load only matter to DBStorage
+        '''
+        with FileStorage.__lock:
+            self.__sync()
+            sources = [(bucket, list(bucket)) for _cls, bucket in
+                       chain(FileStorage.__buckets.items(),
+                             FileStorage.__raw.items())
+                       if not cls or issubclass(_cls, cls)]
+
+        for bucket, keys in sources:
+            for key in keys:
+                # a record built since is found in __objects
+                obj = bucket.get(key) or FileStorage.__objects.get(key)
+                if obj is None:
+                    continue
+                if where and any(field(obj, name) != value
+                                 for name, value in where.items()):
+                    continue
+                if isinstance(obj, Record):
+                    obj = obj.model(**obj.to_dict())
+                yield obj
 
     def new(self, obj):
         '''Adds new object to storage dictionary'''
-        self.all().update({obj.to_dict()['__class__'] + '.' + obj.id: obj})
+        key = f'{type(obj).__name__}.{obj.id}'
+
+        with FileStorage.__lock:
+            self.__sync()
+            raw = self.__find_raw(key)
+            if raw is not None:
+                self.__unindex(key, raw)
+            FileStorage.__objects[key] = obj
+            self.__index(key, obj)
+            FileStorage.__dirty.add(key)
+
+    def changed(self, obj):
+        '''
+        Marks obj changed if it is stored, to be written by the next save,
+        and files it again under its new attribute values; a copy iter()
+        built of a lazy record is stored in place of the record
+        '''
+        key = f'{type(obj).__name__}.{getattr(obj, "id", None)}'
+        if FileStorage.__objects.get(key) is not obj and \
+                self.__find_raw(key) is None:
+            return
+
+        with FileStorage.__lock:
+            self.__sync()
+            if FileStorage.__objects.get(key) is not obj:
+                raw = self.__find_raw(key)
+                if raw is None:
+                    return
+                self.__unindex(key, raw)
+                FileStorage.__objects[key] = obj
+            self.__index(key, obj)
+            FileStorage.__encoded.pop(key, None)
+            FileStorage.__dirty.add(key)
 
     def save(self):
-        '''Saves storage dictionary to file'''
-        with open(FileStorage.__file_path, 'w') as f:
-            temp = {}
-            temp.update(FileStorage.__objects)
-            for key, val in temp.items():
-                temp[key] = val.to_dict()
-            json.dump(temp, f)
+        '''
+        Saves storage dictionary to file, or appends the changes made
+        since the last save to the journal in journal mode
+        '''
+        if FileStorage.__thread.batch_depth:
+            return
+
+        with FileStorage.__lock:
+            self.__sync()
+            dirty = self.__take_dirty()
+            if not FileStorage.__journal:
+                self.__write_snapshot()
+                return
+
+            serializer = FileStorage.__serializer
+            journal_path = FileStorage.__file_path + '.journal'
+            with open(journal_path, self.__mode('a')) as f:
+                for key in dirty:
+                    obj = FileStorage.__objects.get(key)
+                    if obj is None:
+                        serializer.append(f, 'delete', key)
+                    else:
+                        serializer.append(f, 'upsert', key,
+                                          self.__encode(key, obj))
+                f.flush()
+                os.fsync(f.fileno())
+                journal_size = f.tell()
+
+            if journal_size >= FileStorage.__journal_max:
+                self.compact()
+
+    def bulk_new(self, objs):
+        '''
+        Adds every object of the iterable objs to storage and saves once,
+        returning how many there were
+        '''
+        objs = list(objs)
+
+        with self.batch():
+            for obj in objs:
+                self.new(obj)
+        return len(objs)
+
+    def compact(self):
+        '''Folds the journal into the storage file'''
+        with FileStorage.__lock:
+            self.__sync()
+            self.__take_dirty()
+            self.__write_snapshot()
+
+    @contextmanager
+    def batch(self):
+        '''
+        Defers every save the current thread makes inside the block and
+        saves once on exit; if the block raises, its changes are dropped
+        and the objects it changed are read back from the file, as
+        DBStorage rolls back. The changes pending on entry are saved first.
+        Other threads keep saving, which writes whatever is pending, the
+        changes made in the block so far included
+        '''
+        if not FileStorage.__thread.batch_depth and self.dirty_count():
+            self.save()
+
+        FileStorage.__thread.batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            FileStorage.__thread.batch_depth -= 1
+            if not FileStorage.__thread.batch_depth:
+                self.__rollback()
+            raise
+        FileStorage.__thread.batch_depth -= 1
+        self.save()
+
+    def dirty_count(self):
+        '''Returns the number of objects changed since the last save'''
+        self.__sync()
+        return len(FileStorage.__dirty)
 
     def reload(self):
-        '''Loads storage dictionary from file'''
-        from models.base_model import BaseModel
-        from models.user import User
+        '''
+        Loads storage dictionary from file; in lazy mode the objects are
+        only built when all() or a relationship property asks for them
+        '''
+        with FileStorage.__lock:
+            self.__sync()
+            for key, val in self.__read_file().items():
+                self.__load(key, val)
+
+            # replay the journal over the file, then cut off a record torn
+            # by a crash, so that the next appends follow the last whole one
+            journal_path = FileStorage.__file_path + '.journal'
+            try:
+                with open(journal_path, self.__mode('r+')) as f:
+                    for op, key, val in FileStorage.__serializer.replay(f):
+                        if op == 'upsert':
+                            self.__load(key, val)
+                        else:
+                            self.__discard(key)
+                    f.truncate(f.tell())
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        '''Nothing to release: the objects are shared by every thread'''
+        pass
+
+    def delete(self, obj=None):
+        '''
+        Delete obj from __objects if it is inside, or the lazy record it
+        is a copy of, built by iter()
+        '''
+        if obj is None:
+            return
+
+        key = f'{type(obj).__name__}.{obj.id}'
+
+        with FileStorage.__lock:
+            self.__sync()
+            if FileStorage.__objects.get(key) is obj:
+                del FileStorage.__objects[key]
+                self.__unindex(key, obj)
+            else:
+                raw = self.__find_raw(key)
+                if raw is None:
+                    return
+                self.__unindex(key, raw)
+            FileStorage.__dirty.add(key)
+        self.save()
+
+    def related(self, cls, attr, value):
+        '''
+        Returns the list of cls objects whose attribute attr equals value,
+        read from the reverse index when attr is an indexed foreign key
+        '''
+        if attr not in FileStorage.__relations.get(cls.__name__, ()):
+            return [obj for obj in self.all(cls).values()
+                    if getattr(obj, attr, None) == value]
+
+        with FileStorage.__lock:
+            self.__sync()
+            index = FileStorage.__related.get((cls.__name__, attr), {})
+            matches = index.get(value, {})
+            return [self.__build(key, obj) if isinstance(obj, Record)
+                    else obj for key, obj in list(matches.items())]
+
+    def observe(self, observer):
+        '''
+        Keeps observer in sync with the objects of observer.model: its
+        add(key, obj) gets every object stored, its remove(key) every
+        object removed and its clear() a rebuild; obj may be a Record
+        '''
+        with FileStorage.__lock:
+            self.__sync()
+            FileStorage.__observers.append(observer)
+            for buckets in (FileStorage.__buckets, FileStorage.__raw):
+                for key, obj in buckets.get(observer.model, {}).items():
+                    observer.add(key, obj)
+        return observer
+
+    def place_columns(self):
+        '''
+        Returns the PlaceColumns of the stored places, brought up to date;
+        fetch it again before querying rather than keeping it around
+        '''
+        from models.engine.place_columns import PlaceColumns
+
+        return self.__side_index(PlaceColumns)
+
+    def geo_index(self):
+        '''
+        Returns the GeoIndex of the stored places, brought up to date;
+        fetch it again before querying rather than keeping it around
+        '''
+        from models.engine.geo_index import GeoIndex
+
+        return self.__side_index(GeoIndex)
+
+    def link_amenities(self, place, amenity_ids):
+        '''
+        Links place to the amenities of amenity_ids it is not linked to yet
+        and saves once; inside a batch() block the save is deferred too
+        '''
+        place.amenity_ids = chain(place.amenity_ids, amenity_ids)
+        self.new(place)
+        self.save()
+
+    def unlink_amenities(self, place, amenity_ids):
+        '''
+        Unlinks place from the amenities of amenity_ids and saves once;
+        inside a batch() block the save is deferred too
+        '''
+        unlinked = set(amenity_ids)
+        place.amenity_ids = [amenity_id for amenity_id in place.amenity_ids
+                             if amenity_id not in unlinked]
+        self.new(place)
+        self.save()
+
+    def amenity_index(self):
+        '''
+        Returns the AmenityIndex of the stored places, brought up to date;
+        fetch it again before querying rather than keeping it around
+        '''
+        from models.engine.amenity_index import AmenityIndex
+
+        return self.__side_index(AmenityIndex)
+
+    def places_with_amenities(self, all_of=(), any_of=()):
+        '''
+        Returns the list of places linked to every amenity id of all_of
+        and to at least one of any_of
+        '''
         from models.place import Place
-        from models.state import State
-        from models.city import City
-        from models.amenity import Amenity
-        from models.review import Review
 
-        classes = {
+        place_ids = self.amenity_index().query(all_of, any_of)
+        return [self.get(Place, place_id) for place_id in place_ids]
+
+    def __side_index(self, _cls):
+        '''Returns the observer of type _cls, creating it on first use'''
+        with FileStorage.__lock:
+            self.__sync()
+            for observer in FileStorage.__observers:
+                if type(observer) is _cls:
+                    return observer
+            return self.observe(_cls())
+
+    def __load(self, key, val):
+        '''Stores the record val read from the file under key'''
+        FileStorage.__encoded.pop(key, None)
+        self.__discard(key)
+
+        _cls = self.__model_classes()[val['__class__']]
+        if FileStorage.__lazy:
+            self.__index(key, pack(_cls, val))
+        else:
+            obj = _cls(**val)
+            FileStorage.__objects[key] = obj
+            self.__index(key, obj)
+
+    def __discard(self, key):
+        '''Removes the object or raw record stored under key'''
+        if key in FileStorage.__objects:
+            self.__unindex(key, FileStorage.__objects.pop(key))
+            return
+
+        raw = self.__find_raw(key)
+        if raw is not None:
+            self.__unindex(key, raw)
+
+    def __read_file(self):
+        '''Returns the records of the storage file, by key'''
+        # fall back to the previous generation if the file is unreadable,
+        # and raise the error of the file if that cannot be read either
+        try:
+            with open(FileStorage.__file_path, self.__mode('r')) as f:
+                return FileStorage.__serializer.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError as error:
+            try:
+                with open(FileStorage.__file_path + '.bak',
+                          self.__mode('r')) as f:
+                    return FileStorage.__serializer.load(f)
+            except (OSError, ValueError):
+                raise error
+
+    def __rollback(self):
+        '''
+        Drops the changes made since the last save, reading the objects
+        they touched back from the file and its journal
+        '''
+        with FileStorage.__lock:
+            self.__sync()
+            dirty = self.__take_dirty()
+            if not dirty:
+                return
+
+            saved = self.__read_file()
+            try:
+                with open(FileStorage.__file_path + '.journal',
+                          self.__mode('r')) as f:
+                    for op, key, val in FileStorage.__serializer.replay(f):
+                        saved[key] = val
+            except FileNotFoundError:
+                pass
+
+            for key in dirty:
+                if saved.get(key) is None:
+                    self.__discard(key)
+                else:
+                    self.__load(key, saved[key])
+
+    def __find_raw(self, key):
+        '''Returns the raw record stored under key, if not built yet'''
+        if not FileStorage.__raw:
+            return None
+
+        _cls = self.__model_classes().get(key.partition('.')[0])
+        return FileStorage.__raw.get(_cls, {}).get(key)
+
+    def __build(self, key, record):
+        '''Builds the object of the raw record and stores it'''
+        obj = record.model(**record.to_dict())
+
+        del FileStorage.__raw[record.model][key]
+        FileStorage.__objects[key] = obj
+        self.__index(key, obj)
+        return obj
+
+    def __materialize(self, cls):
+        '''Builds the objects of every raw record of cls'''
+        with FileStorage.__lock:
+            self.__sync()
+            for _cls, raw in FileStorage.__raw.items():
+                if raw and issubclass(_cls, cls):
+                    for key, val in list(raw.items()):
+                        self.__build(key, val)
+
+    def __model_classes(self):
+        '''Returns the model classes by name'''
+        if FileStorage.__classes is None:
+            from models.base_model import BaseModel
+            from models.user import User
+            from models.place import Place
+            from models.state import State
+            from models.city import City
+            from models.amenity import Amenity
+            from models.review import Review
+
+            FileStorage.__classes = {
                     'BaseModel': BaseModel, 'User': User, 'Place': Place,
                     'State': State, 'City': City, 'Amenity': Amenity,
                     'Review': Review
                   }
+        return FileStorage.__classes
+
+    def __index(self, key, obj):
+        '''
+        Files obj, an object or a raw record, under key in the bucket
+        of its class and in the FK indexes
+        '''
+        if isinstance(obj, Record):
+            _cls = obj.model
+            buckets = FileStorage.__raw
+        else:
+            _cls = type(obj)
+            buckets = FileStorage.__buckets
+
+        if _cls not in buckets:
+            buckets[_cls] = {}
+        buckets[_cls][key] = obj
+
+        for observer in FileStorage.__observers:
+            if observer.model is _cls:
+                observer.add(key, obj)
+
+        attrs = FileStorage.__relations.get(_cls.__name__)
+        if not attrs:
+            return
+
+        values = tuple(field(obj, attr) for attr in attrs)
+        old_values = FileStorage.__fk_values.get(key)
+        if old_values is not None and old_values != values:
+            self.__unrelate(key, _cls, old_values)
+
+        for attr, value in zip(attrs, values):
+            index = FileStorage.__related.setdefault((_cls.__name__, attr),
+                                                     {})
+            index.setdefault(value, {})[key] = obj
+        FileStorage.__fk_values[key] = values
+
+    def __unindex(self, key, obj):
+        '''Removes obj stored under key from the bucket and FK indexes'''
+        if isinstance(obj, Record):
+            _cls = obj.model
+            del FileStorage.__raw[_cls][key]
+        else:
+            _cls = type(obj)
+            del FileStorage.__buckets[_cls][key]
+
+        for observer in FileStorage.__observers:
+            if observer.model is _cls:
+                observer.remove(key)
+
+        old_values = FileStorage.__fk_values.pop(key, None)
+        if old_values is not None:
+            self.__unrelate(key, _cls, old_values)
+
+    def __unrelate(self, key, _cls, values):
+        '''Removes key from the FK index entries of the given values'''
+        attrs = FileStorage.__relations[_cls.__name__]
+
+        for attr, value in zip(attrs, values):
+            index = FileStorage.__related[(_cls.__name__, attr)]
+            index[value].pop(key, None)
+            if not index[value]:
+                del index[value]
+
+    def __write_snapshot(self):
+        '''
+        Writes every object in storage to a temporary file, then renames
+        it over the storage file, keeping the previous one as <file>.bak,
+        and removes the journal, whose changes the new file holds
+        '''
+        path = FileStorage.__file_path
+        tmp_path = path + '.tmp'
+
+        items = chain(FileStorage.__objects.items(),
+                      *(raw.items() for raw in FileStorage.__raw.values()))
+        with open(tmp_path, self.__mode('w')) as f:
+            FileStorage.__serializer.dump(((key, self.__encode(key, obj))
+                                           for key, obj in items), f)
+            f.flush()
+            os.fsync(f.fileno())
+
+        if os.path.exists(path):
+            try:
+                os.remove(path + '.bak')
+            except FileNotFoundError:
+                pass
+            try:
+                os.link(path, path + '.bak')
+            except OSError:
+                shutil.copy2(path, path + '.bak')
+        os.replace(tmp_path, path)
+        # replayed over the new file, the journal would undo newer changes
         try:
-            temp = {}
-            with open(FileStorage.__file_path, 'r') as f:
-                temp = json.load(f)
-                for key, val in temp.items():
-                    self.all()[key] = classes[val['__class__']](**val)
+            os.remove(path + '.journal')
         except FileNotFoundError:
             pass
 
-    def delete(self, obj=None):
-        '''Delete obj from __objects if it is inside'''
-        dict_objs = self.all()
+        try:
+            dir_fd = os.open(os.path.dirname(path) or '.', os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(dir_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(dir_fd)
 
-        if obj in dict_objs.values():
-            del dict_objs[f'{obj.to_dict()["__class__"]}.{obj.id}']
-            self.save()
+    def __encode(self, key, obj):
+        '''Returns the cached encoding of obj, encoding it on a cache miss'''
+        encoded = FileStorage.__encoded.get(key)
+
+        if encoded is None:
+            if isinstance(obj, Record):
+                obj = obj.to_dict()
+            encoded = FileStorage.__serializer.encode(obj)
+            FileStorage.__encoded[key] = encoded
+        return encoded
+
+    def __mode(self, mode):
+        '''Returns the file mode for the format of the serializer'''
+        return mode + 'b' if FileStorage.__serializer.binary else mode
+
+    def __take_dirty(self):
+        '''Drops the cached JSON of the dirty keys and marks them clean'''
+        dirty = FileStorage.__dirty
+
+        for key in dirty:
+            FileStorage.__encoded.pop(key, None)
+        FileStorage.__dirty = set()
+        return dirty
+
+    def __sync(self):
+        '''Rebuilds the per-class buckets if __objects was replaced'''
+        if FileStorage.__indexed is FileStorage.__objects:
+            return
+
+        # the file still holds the replaced objects, so all keys changed
+        if FileStorage.__indexed is not None:
+            FileStorage.__dirty.update(FileStorage.__indexed)
+        for raw in FileStorage.__raw.values():
+            FileStorage.__dirty.update(raw)
+        FileStorage.__dirty.update(FileStorage.__objects)
+        FileStorage.__encoded = {}
+        FileStorage.__raw = {}
+
+        FileStorage.__buckets = {}
+        FileStorage.__related = {}
+        FileStorage.__fk_values = {}
+        for observer in FileStorage.__observers:
+            observer.clear()
+        for key, obj in FileStorage.__objects.items():
+            self.__index(key, obj)
+        FileStorage.__indexed = FileStorage.__objects
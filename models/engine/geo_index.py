@@ -0,0 +1,139 @@
+#!/usr/bin/python3
+'''This module defines a spatial index of places for distance queries'''
+from math import asin, cos, degrees, floor, radians, sin, sqrt
+from models.engine.records import field
+from models.place import Place
+
+EARTH_RADIUS = 6371.0088
+KM_PER_DEGREE = radians(EARTH_RADIUS)
+HALF_CIRCUMFERENCE = KM_PER_DEGREE * 180
+
+
+def distance(lat1, lon1, lat2, lon2):
+    '''Returns the great-circle distance in km between two points'''
+    lat1, lon1, lat2, lon2 = map(radians, (lat1, lon1, lat2, lon2))
+    a = sin((lat2 - lat1) / 2) ** 2 + \
+        cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS * asin(min(1.0, sqrt(a)))
+
+
+class GeoIndex:
+    '''
+    Files the places by latitude/longitude in a grid of cells of
+    cell_size degrees, so that distance queries only look at the
+    places of the cells around the point
+    '''
+    model = Place
+
+    def __init__(self, cell_size=0.5):
+        '''
+        Creates an empty index with cells of cell_size degrees,
+        which must divide 360
+        '''
+        self.__cell_size = cell_size
+        self.__columns = round(360 / cell_size)
+        self.__cells = {}
+        self.__points = {}
+
+    def __len__(self):
+        '''Returns the number of places in the index'''
+        return len(self.__points)
+
+    def add(self, key, obj):
+        '''Files the place obj stored under key by its coordinates'''
+        self.remove(key)
+        try:
+            lat = float(field(obj, 'latitude'))
+            lon = float(field(obj, 'longitude'))
+        except (TypeError, ValueError):
+            return
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            return
+
+        cell = self.__cell(lat, lon)
+        self.__cells.setdefault(cell, {})[key] = (lat, lon, field(obj, 'id'))
+        self.__points[key] = cell
+
+    def remove(self, key):
+        '''Drops the place stored under key'''
+        cell = self.__points.pop(key, None)
+        if cell is None:
+            return
+
+        del self.__cells[cell][key]
+        if not self.__cells[cell]:
+            del self.__cells[cell]
+
+    def clear(self):
+        '''Drops every place'''
+        self.__cells = {}
+        self.__points = {}
+
+    def within(self, lat, lon, radius):
+        '''
+        Returns the (distance in km, id) pairs of the places at most
+        radius km away from the point lat, lon, nearest first
+        '''
+        matches = []
+
+        for cell in self.__cells_around(lat, lon, radius):
+            for p_lat, p_lon, _id in self.__cells.get(cell, {}).values():
+                dist = distance(lat, lon, p_lat, p_lon)
+                if dist <= radius:
+                    matches.append((dist, _id))
+        matches.sort()
+        return matches
+
+    def nearest(self, lat, lon, k=1):
+        '''
+        Returns the (distance in km, id) pairs of the k places
+        nearest to the point lat, lon, nearest first
+        '''
+        if k <= 0:
+            return []
+
+        # widen the radius until it holds k places, the k nearest
+        # places are then the k first ones found within it
+        radius = self.__cell_size * KM_PER_DEGREE / 8
+        while True:
+            matches = self.within(lat, lon, radius)
+            if len(matches) >= k or radius >= HALF_CIRCUMFERENCE:
+                return matches[:k]
+            radius *= 2
+
+    def __cell(self, lat, lon):
+        '''Returns the cell of the point lat, lon'''
+        size = self.__cell_size
+        return (floor((lat + 90) / size),
+                floor((lon + 180) / size) % self.__columns)
+
+    def __cells_around(self, lat, lon, radius):
+        '''Returns the cells holding the points within radius km'''
+        size = self.__cell_size
+        dlat = radius / KM_PER_DEGREE
+        south, north = max(lat - dlat, -90), min(lat + dlat, 90)
+
+        # the longitude span widens with the latitude, up to the whole
+        # circle for the circles reaching a pole
+        ratio = sin(radians(min(dlat, 90))) / cos(radians(lat)) \
+            if abs(lat) < 90 else 2
+        if south <= -90 or north >= 90 or ratio >= 1:
+            dlon = 180
+        else:
+            dlon = degrees(asin(ratio))
+
+        rows = range(floor((south + 90) / size),
+                     floor((north + 90) / size) + 1)
+        if dlon >= 180:
+            columns = range(self.__columns)
+        else:
+            first = floor((lon - dlon + 180) / size)
+            last = floor((lon + dlon + 180) / size)
+            columns = {column % self.__columns
+                       for column in range(first, last + 1)}
+
+        # past the number of occupied cells, walking them is cheaper
+        if len(rows) * len(columns) > len(self.__cells):
+            return [cell for cell in self.__cells
+                    if cell[0] in rows and cell[1] in columns]
+        return [(row, column) for row in rows for column in columns]
@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+'''
+This module defines the schema migrations of DBStorage: version 1 is the
+schema create_all() made before migrations, and each later version
+changes the schema of the one before it
+'''
+from sqlalchemy import (Column, Integer, MetaData, Table, delete, insert,
+                        inspect, select)
+from sqlalchemy.exc import DBAPIError
+from models.base_model import Base
+
+# one row holding the version the database schema is at
+schema_version = Table('schema_version', MetaData(),
+                       Column('version', Integer, nullable=False))
+
+
+def create_indexes(conn):
+    '''
+    Creates the indexes of the models missing from the database of conn,
+    and returns their names
+    '''
+    created = []
+
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {index['name']
+                    for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            if index.name not in existing:
+                index.create(conn)
+                created.append(index.name)
+    return created
+
+
+# the steps by version they bring the schema to, in order
+MIGRATIONS = [
+              (2, 'index the foreign keys and filter columns',
+               create_indexes),
+             ]
+LATEST = MIGRATIONS[-1][0]
+
+
+def current_version(conn):
+    '''
+    Returns the schema version recorded in the database of conn, or 0 if
+    none is, in one query: conn should be one of its own, as a query of
+    a missing table may leave its transaction unusable
+    '''
+    try:
+        return conn.scalar(select(schema_version.c.version)) or 0
+    except DBAPIError:
+        return 0
+
+
+def stamp(conn, version):
+    '''Records version as the schema version of the database of conn'''
+    schema_version.create(conn, checkfirst=True)
+    conn.execute(delete(schema_version))
+    conn.execute(insert(schema_version).values(version=version))
+
+
+def migrate(conn):
+    '''
+    Brings the schema of the database of conn to the latest version and
+    returns the versions applied: a database without tables is created
+    as it is now, and one without a version is taken to be at version 1
+    '''
+    tables = set(inspect(conn).get_table_names())
+    version = 0
+    if schema_version.name in tables:
+        version = conn.scalar(select(schema_version.c.version)) or 0
+    if not version:
+        if not tables & set(Base.metadata.tables):
+            Base.metadata.create_all(conn)
+            stamp(conn, LATEST)
+            return [LATEST]
+        version = 1
+
+    applied = []
+    for step_version, description, step in MIGRATIONS:
+        if step_version > version:
+            step(conn)
+            stamp(conn, step_version)
+            applied.append(step_version)
+    return applied
+
+
+def drop(conn):
+    '''Drops the tables of the models and the schema version'''
+    Base.metadata.drop_all(conn)
+    schema_version.drop(conn, checkfirst=True)
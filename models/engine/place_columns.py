@@ -0,0 +1,138 @@
+#!/usr/bin/python3
+'''This module defines a columnar store of places for vectorized filtering'''
+from models.engine.records import field
+from models.place import Place
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class PlaceColumns:
+    '''
+    Keeps the numeric attributes of places in NumPy arrays, one row per
+    place, and their city_id as integer codes, so that filtering places
+    runs over whole columns instead of Place objects
+    '''
+    model = Place
+    numeric = ('price_by_night', 'number_rooms', 'number_bathrooms',
+               'max_guest', 'latitude', 'longitude')
+
+    def __init__(self, capacity=1024):
+        '''Creates an empty store with room for capacity places'''
+        if np is None:
+            raise ImportError('PlaceColumns requires numpy')
+
+        self.__capacity = capacity
+        self.__columns = {name: np.full(capacity, np.nan)
+                          for name in PlaceColumns.numeric}
+        self.__city = np.full(capacity, -1, dtype=np.int32)
+        self.__alive = np.zeros(capacity, dtype=bool)
+        self.__ids = np.full(capacity, None, dtype=object)
+        self.__rows = {}
+        self.__free = []
+        self.__size = 0
+        self.__city_codes = {}
+
+    def __len__(self):
+        '''Returns the number of places in the store'''
+        return len(self.__rows)
+
+    def add(self, key, obj):
+        '''Stores or updates the row of the place obj stored under key'''
+        row = self.__rows.get(key)
+        if row is None:
+            row = self.__new_row()
+            self.__rows[key] = row
+
+        for name in PlaceColumns.numeric:
+            try:
+                self.__columns[name][row] = float(field(obj, name))
+            except (TypeError, ValueError):
+                self.__columns[name][row] = np.nan
+
+        city_id = field(obj, 'city_id')
+        if city_id not in self.__city_codes:
+            self.__city_codes[city_id] = len(self.__city_codes)
+        self.__city[row] = self.__city_codes[city_id]
+        self.__ids[row] = field(obj, 'id')
+        self.__alive[row] = True
+
+    def remove(self, key):
+        '''Drops the row of the place stored under key'''
+        row = self.__rows.pop(key, None)
+        if row is None:
+            return
+
+        self.__alive[row] = False
+        self.__ids[row] = None
+        self.__free.append(row)
+
+    def clear(self):
+        '''Drops every row'''
+        self.__init__(self.__capacity)
+
+    def query(self, city_ids=None, price_min=None, price_max=None,
+              rooms_min=None, bathrooms_min=None, guests_min=None,
+              bbox=None):
+        '''
+        Returns the ids of the places located in one of city_ids, priced
+        within [price_min, price_max], with at least rooms_min rooms,
+        bathrooms_min bathrooms and room for guests_min guests, and inside
+        bbox, a (south, west, north, east) box; None skips a filter
+        '''
+        size = self.__size
+        columns = {name: column[:size]
+                   for name, column in self.__columns.items()}
+        mask = self.__alive[:size].copy()
+
+        if city_ids is not None:
+            # the last code stands for unknown cities and never matches
+            wanted = np.zeros(len(self.__city_codes) + 1, dtype=bool)
+            for city_id in city_ids:
+                wanted[self.__city_codes.get(city_id, -1)] = True
+            wanted[-1] = False
+            mask &= wanted[self.__city[:size]]
+        if price_min is not None:
+            mask &= columns['price_by_night'] >= price_min
+        if price_max is not None:
+            mask &= columns['price_by_night'] <= price_max
+        if rooms_min is not None:
+            mask &= columns['number_rooms'] >= rooms_min
+        if bathrooms_min is not None:
+            mask &= columns['number_bathrooms'] >= bathrooms_min
+        if guests_min is not None:
+            mask &= columns['max_guest'] >= guests_min
+        if bbox is not None:
+            south, west, north, east = bbox
+            mask &= (columns['latitude'] >= south) & \
+                (columns['latitude'] <= north) & \
+                (columns['longitude'] >= west) & \
+                (columns['longitude'] <= east)
+
+        return self.__ids[:size][mask].tolist()
+
+    def __new_row(self):
+        '''Returns a free row, growing the columns if they are full'''
+        if self.__free:
+            return self.__free.pop()
+
+        if self.__size == self.__capacity:
+            self.__grow()
+        self.__size += 1
+        return self.__size - 1
+
+    def __grow(self):
+        '''Doubles the capacity of every column'''
+        extra = self.__capacity
+        for name, column in self.__columns.items():
+            self.__columns[name] = np.concatenate(
+                (column, np.full(extra, np.nan)))
+        self.__city = np.concatenate(
+            (self.__city, np.full(extra, -1, dtype=np.int32)))
+        self.__alive = np.concatenate(
+            (self.__alive, np.zeros(extra, dtype=bool)))
+        self.__ids = np.concatenate(
+            (self.__ids, np.full(extra, None, dtype=object)))
+        self.__capacity += extra
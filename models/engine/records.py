@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+'''
+This module defines the compact records FileStorage keeps for stored
+objects that were not built yet
+'''
+from models.base_model import BaseModel
+
+
+class Record:
+    '''
+    Slotted stand-in for a stored object, with one slot per attribute
+    declared on its model; other attributes go to the _extra dict
+    '''
+    __slots__ = ('_extra',)
+    model = None
+    fields = ()
+
+    def get(self, name, default=None):
+        '''Returns the value of the attribute name, or default if unset'''
+        if name in self.fields:
+            return getattr(self, name, default)
+        if self._extra is None:
+            return default
+        return self._extra.get(name, default)
+
+    def to_dict(self):
+        '''Returns the record as the dict it was packed from'''
+        dictionary = {}
+
+        for name in self.fields:
+            try:
+                dictionary[name] = getattr(self, name)
+            except AttributeError:
+                pass
+        if self._extra:
+            dictionary.update(self._extra)
+        dictionary['__class__'] = self.model.__name__
+        return dictionary
+
+
+_record_classes = {}
+
+
+def field(obj, name):
+    '''Returns the attribute name of obj, a model or a Record'''
+    if isinstance(obj, Record):
+        default = getattr(obj.model, name, None)
+        if isinstance(default, property):
+            default = None
+        return obj.get(name, default)
+    return getattr(obj, name, None)
+
+
+def record_class(model):
+    '''Returns the Record subclass of model, creating it on first use'''
+    if model in _record_classes:
+        return _record_classes[model]
+
+    fields = ['id', 'created_at', 'updated_at']
+    for _cls in reversed(model.__mro__):
+        for name, value in vars(_cls).items():
+            if not name.startswith('_') and name not in fields and \
+                    type(value) in (str, int, float, list):
+                fields.append(name)
+
+    fields = tuple(fields)
+    _record_classes[model] = type(f'{model.__name__}Record', (Record,),
+                                  {'__slots__': fields, 'model': model,
+                                   'fields': fields})
+    return _record_classes[model]
+
+
+def pack(model, dictionary):
+    '''
+    Returns the compact record of model holding dictionary,
+    with its timestamps parsed into the smaller datetimes
+    '''
+    _cls = record_class(model)
+    record = _cls()
+    extra = None
+
+    for name, value in dictionary.items():
+        if name in ('created_at', 'updated_at') and type(value) is str:
+            setattr(record, name, BaseModel.parse_datetime(value))
+        elif name in _cls.fields:
+            setattr(record, name, value)
+        elif name != '__class__':
+            if extra is None:
+                extra = {}
+            extra[name] = value
+    record._extra = extra
+    return record
@@ -0,0 +1,159 @@
+#!/usr/bin/python3
+'''This module defines the file formats FileStorage can store objects in'''
+import io
+import json
+import pickle
+from datetime import datetime, timedelta
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class JSONSerializer:
+    '''
+    Stores the objects as one JSON dict of their to_dict() forms,
+    and the journal as one JSON record per line
+    '''
+    binary = False
+
+    def encode(self, obj):
+        '''Returns the JSON of obj, a model or a record read earlier'''
+        if type(obj) is not dict:
+            obj = obj.to_dict()
+        return json.dumps(obj, default=datetime.isoformat)
+
+    def dump(self, items, f):
+        '''Writes the (key, encoded object) pairs of items to f'''
+        f.write('{')
+        f.write(', '.join(f'{json.dumps(key)}: {encoded}'
+                          for key, encoded in items))
+        f.write('}')
+
+    def load(self, f):
+        '''Returns the records written to f by dump(), by key'''
+        return json.load(f)
+
+    def append(self, f, op, key, encoded=None):
+        '''Writes a journal record of op on key to f'''
+        if encoded is None:
+            f.write(json.dumps({'op': op, 'key': key}) + '\n')
+        else:
+            f.write(f'{{"op": "{op}", "key": {json.dumps(key)}, '
+                    f'"obj": {encoded}}}\n')
+
+    def replay(self, f):
+        '''
+        Yields the (op, key, record) journal records of f in order, and
+        leaves f at the end of the last whole one
+        '''
+        while True:
+            start = f.tell()
+            line = f.readline()
+            try:
+                # a line cut before its newline is torn, even if it parses
+                if not line.endswith('\n'):
+                    raise ValueError('torn record')
+                record = json.loads(line)
+            except ValueError:
+                f.seek(start)
+                return
+            yield record['op'], record['key'], record.get('obj')
+
+
+class _RecordUnpickler(pickle.Unpickler):
+    '''Unpickler that refuses anything but plain records'''
+
+    def find_class(self, module, name):
+        '''Forbids loading any global'''
+        raise pickle.UnpicklingError(f'global {module}.{name} is forbidden')
+
+
+class BinarySerializer:
+    '''
+    Stores every object as a pickle frame of its attributes, with the
+    timestamps as integer microseconds since the epoch
+    '''
+    binary = True
+    magic = b'HBNB\x01'
+
+    def encode(self, obj):
+        '''Returns the pickle frame of obj, a model or a record read earlier'''
+        if type(obj) is dict:
+            record = dict(obj)
+        else:
+            record = dict(obj.__dict__)
+            record.pop('_sa_instance_state', None)
+            record['__class__'] = type(obj).__name__
+            # a place keeps its amenity links in a list of its own class
+            if 'amenity_ids' in record:
+                record['amenity_ids'] = list(record['amenity_ids'])
+
+        for name in ('created_at', 'updated_at'):
+            if isinstance(record.get(name), datetime):
+                record[name] = (record[name] - _EPOCH) // _MICROSECOND
+        return pickle.dumps(record, protocol=5)
+
+    def dump(self, items, f):
+        '''
+        Writes the encoded objects of the (key, encoded object) pairs
+        of items to f, the keys being rebuilt from the records on load
+        '''
+        f.write(self.magic)
+        for key, encoded in items:
+            f.write(encoded)
+
+    def load(self, f):
+        '''Returns the records written to f by dump(), by key'''
+        if f.read(len(self.magic)) != self.magic:
+            raise ValueError('not a binary storage file')
+
+        records = {}
+        data = io.BytesIO(f.read())
+        unpickler = _RecordUnpickler(data)
+        size = len(data.getbuffer())
+        try:
+            while data.tell() < size:
+                record = self.decode(unpickler.load())
+                records[f"{record['__class__']}.{record['id']}"] = record
+        except (pickle.UnpicklingError, EOFError, KeyError) as err:
+            raise ValueError('corrupt binary storage file') from err
+        return records
+
+    def append(self, f, op, key, encoded=None):
+        '''Writes a journal record of op on key to f'''
+        f.write(pickle.dumps((op, key), protocol=5))
+        if encoded is not None:
+            f.write(encoded)
+
+    def replay(self, f):
+        '''
+        Yields the (op, key, record) journal records of f in order, and
+        leaves f at the end of the last whole one
+        '''
+        unpickler = _RecordUnpickler(f)
+        while True:
+            start = f.tell()
+            try:
+                op, key = unpickler.load()
+                record = None
+                if op == 'upsert':
+                    record = self.decode(unpickler.load())
+            except (pickle.UnpicklingError, EOFError, ValueError):
+                f.seek(start)
+                return
+            yield op, key, record
+
+    def decode(self, record):
+        '''Turns the timestamps of record back into datetimes'''
+        if type(record) is not dict:
+            raise pickle.UnpicklingError('not a storage record')
+        for name in ('created_at', 'updated_at'):
+            if type(record.get(name)) is int:
+                record[name] = _EPOCH + record[name] * _MICROSECOND
+        return record
+
+
+serializers = {
+                'json': JSONSerializer,
+                'binary': BinarySerializer
+              }
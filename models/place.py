@@ -2,9 +2,11 @@
 ''' Place Module for HBNB project '''
 from models.base_model import BaseModel, Base
 from models import storage
-from sqlalchemy import Table, String, Column, Integer, Float, ForeignKey
+from sqlalchemy import (Table, String, Column, Integer, Float, ForeignKey,
+                        Index)
 from sqlalchemy.orm import relationship
 from os import getenv
+import weakref
 
 place_amenity = Table('place_amenity', Base.metadata,
                       Column('place_id', String(60),
@@ -12,27 +14,92 @@ place_amenity = Table('place_amenity', Base.metadata,
                              primary_key=True, nullable=False),
                       Column('amenity_id', String(60),
                              ForeignKey('amenities.id', ondelete='CASCADE'),
-                             primary_key=True, nullable=False)
+                             primary_key=True, nullable=False, index=True)
                       )
 
 
+class AmenityIds(list):
+    '''
+    The ids of the amenities linked to a place in file storage, without
+    repeats: a list which tests membership in O(1) and tells the storage
+    the place changed whenever it does
+    '''
+
+    def __init__(self, place, ids=()):
+        '''Holds the ids for place, dropping repeats'''
+        super().__init__(dict.fromkeys(ids))
+        self.__ids = set(self)
+        self.__place = weakref.ref(place)
+
+    def __contains__(self, amenity_id):
+        '''Tests membership in the set of the ids'''
+        return amenity_id in self.__ids
+
+    def append(self, amenity_id):
+        '''Appends amenity_id, unless it is in already'''
+        if amenity_id not in self.__ids:
+            super().append(amenity_id)
+            self.__ids.add(amenity_id)
+            self.__changed()
+
+    def __resync(self):
+        '''Drops the repeats a change made and rebuilds the set'''
+        ids = dict.fromkeys(self)
+        if len(ids) != len(self):
+            list.__init__(self, ids)
+        self.__ids = set(ids)
+        self.__changed()
+
+    def __changed(self):
+        '''Tells the storage the place changed'''
+        place = self.__place()
+        if place is not None:
+            storage.changed(place)
+
+
+def _resyncing(name):
+    '''Returns the list method name, resyncing AmenityIds after it runs'''
+    method = getattr(list, name)
+
+    def mutate(self, *args):
+        result = method(self, *args)
+        self._AmenityIds__resync()
+        return result
+
+    mutate.__name__ = name
+    mutate.__doc__ = method.__doc__
+    return mutate
+
+
+for _name in ('extend', 'insert', 'remove', 'pop', 'clear', 'sort',
+              'reverse', '__setitem__', '__delitem__', '__iadd__',
+              '__imul__'):
+    setattr(AmenityIds, _name, _resyncing(_name))
+
+
 class Place(BaseModel, Base):
     ''' The Place class '''
     __tablename__ = 'places'
 
     if getenv('HBNB_TYPE_STORAGE') == 'db':
+        # places of a city within a price range; leading with city_id,
+        # it also serves the lookups by city_id alone
+        __table_args__ = (Index('ix_places_city_id_price_by_night',
+                                'city_id', 'price_by_night'),)
+
         city_id = Column(String(60),
                          ForeignKey('cities.id', ondelete='CASCADE'),
                          nullable=False)
         user_id = Column(String(60),
                          ForeignKey('users.id', ondelete='CASCADE'),
-                         nullable=False)
+                         nullable=False, index=True)
         name = Column(String(128), nullable=False)
         description = Column(String(1024), nullable=True)
         number_rooms = Column(Integer, nullable=False, default=0)
         number_bathrooms = Column(Integer, nullable=False, default=0)
         max_guest = Column(Integer, nullable=False, default=0)
-        price_by_night = Column(Integer, nullable=False, default=0)
+        price_by_night = Column(Integer, nullable=False, default=0,
+                                index=True)
         latitude = Column(Float, nullable=True)
         longitude = Column(Float, nullable=True)
         amenities = relationship("Amenity",
@@ -53,28 +120,35 @@ class Place(BaseModel, Base):
         price_by_night = 0
         latitude = 0.0
         longitude = 0.0
-        amenity_ids = []
 
         @property
-        def reviews(self):
-            '''Retrieve all reviews associated with this place'''
-            all_reviews = storage.all(Review)
-            place_reviews = []
+        def amenity_ids(self):
+            '''The AmenityIds list of the amenities linked to this place'''
+            ids = self.__dict__.get('amenity_ids')
+            if type(ids) is not AmenityIds:
+                ids = AmenityIds(self, ids or ())
+                self.__dict__['amenity_ids'] = ids
+            return ids
 
-            for rev in all_reviews.values():
-                if rev.place_id == self.id:
-                    place_reviews.append(rev)
+        @amenity_ids.setter
+        def amenity_ids(self, ids):
+            '''Links the place to the amenities of ids, dropping repeats'''
+            self.__dict__['amenity_ids'] = AmenityIds(self, ids)
 
-            return place_reviews
+        @property
+        def reviews(self):
+            '''Retrieve all reviews associated with this place'''
+            from models.review import Review
+            return storage.related(Review, 'place_id', self.id)
 
         @property
         def amenities(self):
             '''getter attribute returns the list of Amenity instances'''
             from models.amenity import Amenity
             amenity_list = []
-            all_amenities = storage.all(Amenity)
-            for amenity in all_amenities.values():
-                if amenity.id in self.amenity_ids:
+            for amenity_id in self.amenity_ids:
+                amenity = storage.get(Amenity, amenity_id)
+                if amenity is not None:
                     amenity_list.append(amenity)
             return amenity_list
 
@@ -84,5 +158,6 @@ class Place(BaseModel, Base):
             handles append method for adding an
             Amenity.id to the attribute amenity_ids
             '''
-            if type(obj) is Amenity and obj.id not in self.amenity_ids:
+            from models.amenity import Amenity
+            if type(obj) is Amenity:
                 self.amenity_ids.append(obj.id)
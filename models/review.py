@@ -13,10 +13,10 @@ class Review(BaseModel, Base):
         text = Column(Text(1024), nullable=False)
         place_id = Column(String(60),
                           ForeignKey('places.id', ondelete='CASCADE'),
-                          nullable=False)
+                          nullable=False, index=True)
         user_id = Column(String(60),
                          ForeignKey('users.id', ondelete='CASCADE'),
-                         nullable=False)
+                         nullable=False, index=True)
     else:
         text = ''
         place_id = ''
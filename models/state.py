@@ -21,11 +21,4 @@ class State(BaseModel, Base):
         @property
         def cities(self):
             '''Retrieve all cities associated with this state'''
-            dict_objs = storage.all(City)
-            state_cities = []
-
-            for city in dict_objs.values():
-                if city.state_id == self.id:
-                    state_cities.append(city)
-
-            return state_cities
+            return storage.related(City, 'state_id', self.id)
@@ -1,5 +1,6 @@
 #!/usr/bin/python3
 '''This module defines a class User'''
+from models import storage
 from models.base_model import BaseModel, Base
 from sqlalchemy import Column, String
 from sqlalchemy.orm import relationship
@@ -12,7 +13,7 @@ class User(BaseModel, Base):
     __tablename__ = 'users'
 
     if getenv('HBNB_TYPE_STORAGE') == 'db':
-        email = Column(String(128), nullable=False)
+        email = Column(String(128), nullable=False, unique=True, index=True)
         password = Column(String(128), nullable=False)
         first_name = Column(String(128), nullable=True)
         last_name = Column(String(128), nullable=True)
@@ -23,3 +24,15 @@ class User(BaseModel, Base):
         password = ''
         first_name = ''
         last_name = ''
+
+        @property
+        def places(self):
+            '''Retrieve all places owned by this user'''
+            from models.place import Place
+            return storage.related(Place, 'user_id', self.id)
+
+        @property
+        def reviews(self):
+            '''Retrieve all reviews written by this user'''
+            from models.review import Review
+            return storage.related(Review, 'user_id', self.id)
@@ -12,6 +12,7 @@ Test Classes:
 import unittest
 import os
 import sys
+import uuid
 from io import StringIO
 from unittest.mock import patch
 from console import HBNBCommand
@@ -91,7 +92,8 @@ class TestCreateCommand(unittest.TestCase):
         self.san_jose = City(name='San Jose', state_id=self.arizona.id)
         self.san_jose.save()
 
-        self.john_doe = User(email='john_doe@baz.com', password='mlmlml',
+        self.john_doe = User(email=f'john_doe_{uuid.uuid4()}@baz.com',
+                             password='mlmlml',
                              first_name='John', last_name='Doe')
         self.john_doe.save()
 
@@ -280,6 +282,15 @@ class TestShowCommand(unittest.TestCase):
 
             self.assertEqual(output, str(self.arizona))
 
+    def test_show_other_class(self):
+        '''Test showing an instance under a class it does not have'''
+
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd(f'show BaseModel {self.arizona.id}')
+            output = f.getvalue().strip()
+
+            self.assertEqual(output, '** no instance found **')
+
 
 class TestDestroyCommand(unittest.TestCase):
     """
@@ -344,3 +355,260 @@ class TestDestroyCommand(unittest.TestCase):
             objs_dict = self.storage.all()
 
             self.assertNotIn(f'User.{user_m.id}', objs_dict.keys())
+
+
+class TestAllCommand(unittest.TestCase):
+    """
+    Unittests the `all` command
+    """
+
+    def setUp(self):
+        '''Runs before every test'''
+        from models import storage
+
+        self.storage = storage
+        if os.getenv('HBNB_TYPE_STORAGE') != 'db':
+            type(self.storage)._FileStorage__objects = {}
+
+    def tearDown(self):
+        '''Runs after each test'''
+
+        if os.getenv('HBNB_TYPE_STORAGE') != 'db':
+            type(self.storage)._FileStorage__objects = {}
+
+    def test_errors(self):
+        '''Test Errors mangement of `all` command'''
+
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd('all Country')
+            output = f.getvalue().strip()
+
+            self.assertEqual(output, '** class doesn\'t exist **')
+
+    def test_all_of_a_class(self):
+        '''Test listing the instances of a class'''
+
+        arizona = State(name='Arizona')
+        arizona.save()
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd('all State')
+            output = f.getvalue().strip()
+
+        states = eval(output)
+        self.assertEqual(len(states), self.storage.count(State))
+        self.assertTrue(all(obj.startswith('[State] (') for obj in states))
+        self.assertIn(f'[State] ({arizona.id})', output)
+
+    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') == 'db', 'Using DBStorage')
+    def test_all(self):
+        '''Test listing every instance'''
+
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd('all')
+            output = f.getvalue().strip()
+
+            self.assertEqual(output, '[]')
+
+        State(name='Arizona').save()
+        User(email='a@b.c', password='pwd').save()
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd('all')
+            output = f.getvalue().strip()
+
+        objs = [str(obj) for obj in self.storage.all().values()]
+        self.assertEqual(sorted(eval(output)), sorted(objs))
+
+    def test_all_base_model(self):
+        '''Test listing BaseModel leaves the other classes out'''
+
+        State(name='Arizona').save()
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd('all BaseModel')
+            output = f.getvalue().strip()
+
+        self.assertTrue(all(obj.startswith('[BaseModel] (')
+                            for obj in eval(output)))
+        self.assertNotIn('[State] (', output)
+
+
+class TestCountCommand(unittest.TestCase):
+    """
+    Unittests the `count` command
+    """
+
+    def test_errors(self):
+        '''Test Errors mangement of `count` command'''
+
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd('count Country')
+            output = f.getvalue().strip()
+
+            self.assertEqual(output, '** class doesn\'t exist **')
+
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd('count')
+            output = f.getvalue().strip()
+
+            self.assertEqual(output, '** class name missing **')
+
+    def test_count(self):
+        '''Test counting the instances of a class'''
+
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd('count State')
+            count = int(f.getvalue())
+
+        State(name='Arizona').save()
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd(HBNBCommand().precmd('State.count()'))
+            output = f.getvalue().strip()
+
+            self.assertEqual(output, str(count + 1))
+
+    def test_count_base_model(self):
+        '''Test counting BaseModel leaves the other classes out'''
+
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd('count BaseModel')
+            count = int(f.getvalue())
+
+        State(name='Arizona').save()
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd('count BaseModel')
+            output = f.getvalue().strip()
+
+            self.assertEqual(output, str(count))
+
+
+class TestBulkCreateCommand(unittest.TestCase):
+    """
+    Unittests the `bulk_create` command
+    """
+
+    def setUp(self):
+        '''Runs before every test'''
+        from models import storage
+
+        self.storage = storage
+        if os.getenv('HBNB_TYPE_STORAGE') != 'db':
+            type(self.storage)._FileStorage__objects = {}
+
+        with open('bulk.jsonl', 'w') as f:
+            f.write('{"name": "Arizona"}\n\n{"name": "Texas"}\n')
+
+    def tearDown(self):
+        '''Runs after each test'''
+
+        os.remove('bulk.jsonl')
+        if os.getenv('HBNB_TYPE_STORAGE') != 'db':
+            type(self.storage)._FileStorage__objects = {}
+
+    def test_errors(self):
+        '''Test Errors mangement of `bulk_create` command'''
+
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd('bulk_create')
+            output = f.getvalue().strip()
+
+            self.assertEqual(output, '** class name missing **')
+
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd('bulk_create Country bulk.jsonl')
+            output = f.getvalue().strip()
+
+            self.assertEqual(output, '** class doesn\'t exist **')
+
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd('bulk_create State')
+            output = f.getvalue().strip()
+
+            self.assertEqual(output, '** file name missing **')
+
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd('bulk_create State missing.jsonl')
+            output = f.getvalue().strip()
+
+            self.assertEqual(output, '** file doesn\'t exist **')
+
+        with open('bulk.jsonl', 'a') as f:
+            f.write('["Utah"]\n')
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd('bulk_create State bulk.jsonl')
+            output = f.getvalue().strip()
+
+            self.assertEqual(output, '** invalid line 4 **')
+
+    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') == 'db', 'Using DBStorage')
+    def test_bulk_create(self):
+        '''Test creating the instances of a file'''
+
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd('bulk_create State bulk.jsonl')
+            output = f.getvalue().strip()
+
+            self.assertTrue(output.startswith('2 created in '))
+
+        names = [obj.name for obj in self.storage.all(State).values()]
+        self.assertCountEqual(names, ['Arizona', 'Texas'])
+
+
+class TestNearbyCommands(unittest.TestCase):
+    """
+    Unittests the `nearby` and `nearest` commands
+    """
+
+    def setUp(self):
+        '''Runs before every test'''
+        from models import storage
+
+        self.storage = storage
+        if os.getenv('HBNB_TYPE_STORAGE') != 'db':
+            type(self.storage)._FileStorage__objects = {}
+
+        self.place = Place(name='Kasbah', latitude=31.4337,
+                           longitude=-4.2304)
+        if os.getenv('HBNB_TYPE_STORAGE') != 'db':
+            self.place.save()
+
+    def tearDown(self):
+        '''Runs after each test'''
+
+        if os.getenv('HBNB_TYPE_STORAGE') != 'db':
+            type(self.storage)._FileStorage__objects = {}
+
+    def test_errors(self):
+        '''Test Errors mangement of `nearby` and `nearest` commands'''
+
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd('nearby 31.4')
+            output = f.getvalue().strip()
+
+            self.assertEqual(output, '** coordinates missing **')
+
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd('nearest 95 -4.2')
+            output = f.getvalue().strip()
+
+            self.assertEqual(output, '** invalid coordinates **')
+
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd('nearby 31.4 -4.2')
+            output = f.getvalue().strip()
+
+            self.assertEqual(output, '** radius missing **')
+
+    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') == 'db', 'Using DBStorage')
+    def test_nearby(self):
+        '''Test listing the places around a point'''
+
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd('nearby 31.4337 -4.2304 1')
+            output = f.getvalue().strip()
+
+            self.assertEqual(output, f'{self.place.id} 0.000 km')
+
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd('nearest 31.4 -4.2 3')
+            output = f.getvalue().strip()
+
+            self.assertTrue(output.startswith(self.place.id))
@@ -24,10 +24,11 @@ class test_basemodel(unittest.TestCase):
         pass
 
     def tearDown(self):
-        try:
-            os.remove('file.json')
-        except FileNotFoundError:
-            pass
+        for path in ('file.json', 'file.json.bak'):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
 
     def test_default(self):
         """ """
@@ -94,3 +95,21 @@ class test_basemodel(unittest.TestCase):
         sleep(0.5)
         new.save()
         self.assertNotEqual(new.created_at, new.updated_at)
+
+    def test_kwargs_timestamps(self):
+        """ """
+        new = self.value(created_at='2020-02-18T14:21:12.096959',
+                         updated_at='2020-02-18T14:21:12')
+        self.assertEqual(new.created_at,
+                         datetime.datetime(2020, 2, 18, 14, 21, 12, 96959))
+        self.assertEqual(new.updated_at,
+                         datetime.datetime(2020, 2, 18, 14, 21, 12))
+
+    def test_todict_after_update(self):
+        """ """
+        new = self.value()
+        before = new.to_dict()
+        new.updated_at = datetime.datetime(2020, 2, 18, 14, 21, 12, 96959)
+        after = new.to_dict()
+        self.assertEqual(after['created_at'], before['created_at'])
+        self.assertEqual(after['updated_at'], '2020-02-18T14:21:12.096959')
@@ -0,0 +1,208 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/async_db_storage.py.
+
+Unittest classes:
+    TestAsyncDBStorageDocs
+    TestAsyncDBStorage
+    TestAsyncMigrations
+"""
+import asyncio
+import unittest
+import os
+import inspect
+import tempfile
+import pep8
+from unittest.mock import patch
+from models.base_model import BaseModel
+from models.engine import migrations
+from models.state import State
+
+# the models are mapped in db mode, where an async URL is given to test on
+ASYNC = os.getenv('HBNB_TYPE_STORAGE') == 'db' and \
+    bool(os.getenv('HBNB_DB_ASYNC_URL'))
+
+
+@unittest.skipIf(not ASYNC, 'Not using AsyncDBStorage')
+class TestAsyncDBStorageDocs(unittest.TestCase):
+    """Tests to check the documentation and style of AsyncDBStorage"""
+
+    def test_pep8_conformance_async_db_storage(self):
+        """Test that models/engine/async_db_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/async_db_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_async_db_storage_func_docstrings(self):
+        """Test for the presence of docstrings in AsyncDBStorage methods"""
+        from models.engine.async_db_storage import AsyncDBStorage
+
+        self.assertTrue(AsyncDBStorage.__doc__)
+        for name, func in inspect.getmembers(AsyncDBStorage,
+                                             inspect.isfunction):
+            self.assertTrue(func.__doc__,
+                            "{:s} method needs a docstring".format(name))
+
+
+@unittest.skipIf(not ASYNC, 'Not using AsyncDBStorage')
+class TestAsyncDBStorage(unittest.TestCase):
+    """testing the coroutines of AsyncDBStorage"""
+
+    def setUp(self):
+        from models.engine.async_db_storage import AsyncDBStorage
+
+        self.storage = AsyncDBStorage()
+
+    def run_task(self, coroutine, reload=True):
+        """Runs coroutine in a task, then closes its session"""
+        async def task():
+            if reload:
+                await self.storage.reload()
+            try:
+                return await coroutine
+            finally:
+                await self.storage.close()
+                await self.storage.dispose()
+
+        return asyncio.run(task())
+
+    def test_save_get_delete(self):
+        async def scenario():
+            state = State(name="Tafilalet")
+            self.storage.new(state)
+            await self.storage.save()
+            found = await self.storage.get(State, state.id)
+            await self.storage.delete(found)
+            return found, await self.storage.get(State, state.id)
+
+        found, missing = self.run_task(scenario())
+        self.assertEqual(found.name, "Tafilalet")
+        self.assertIsNone(missing)
+
+    def test_without_reload(self):
+        async def scenario():
+            state = State(name="Tafilalet")
+            self.storage.new(state)
+            await self.storage.save()
+            count = await self.storage.count(State)
+            await self.storage.delete(state)
+            return count
+
+        self.assertGreaterEqual(self.run_task(scenario(), reload=False), 1)
+
+    def test_all_count(self):
+        async def scenario():
+            state = State(name="Tafilalet")
+            self.storage.new(state)
+            await self.storage.save()
+            objs = await self.storage.all(State, load=['cities'])
+            count = await self.storage.count(State)
+            await self.storage.delete(state)
+            return state, objs, count
+
+        state, objs, count = self.run_task(scenario())
+        self.assertIn(f'State.{state.id}', objs)
+        self.assertEqual(objs[f'State.{state.id}'].cities, [])
+        self.assertEqual(count, len(objs))
+
+    def test_iter(self):
+        async def scenario():
+            state = State(name="Tafilalet")
+            self.storage.new(state)
+            await self.storage.save()
+            found = [obj async for obj in self.storage.iter(
+                State, batch_size=2, where={'id': state.id})]
+            states = [obj async for obj in self.storage.iter(State)]
+            count = await self.storage.count(State)
+            await self.storage.delete(state)
+            return state, found, states, count
+
+        state, found, states, count = self.run_task(scenario())
+        self.assertEqual(found, [state])
+        self.assertEqual(len(states), count)
+
+    def test_unmapped_class(self):
+        async def scenario():
+            return (await self.storage.get(BaseModel, 'id'),
+                    await self.storage.count(BaseModel),
+                    await self.storage.all(BaseModel),
+                    [obj async for obj in self.storage.iter(BaseModel)])
+
+        self.assertEqual(self.run_task(scenario()), (None, 0, {}, []))
+
+    def test_sessions_per_task(self):
+        async def scenario():
+            async def session():
+                return self.storage._AsyncDBStorage__session()
+
+            return await asyncio.gather(session(), session())
+
+        first, second = self.run_task(scenario())
+        self.assertIsNot(first, second)
+
+
+@unittest.skipIf(not ASYNC, 'Not using AsyncDBStorage')
+class TestAsyncMigrations(unittest.TestCase):
+    """testing the schema migrations of AsyncDBStorage"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, 'scratch.db')
+        self.url = f'sqlite+aiosqlite:///{path}'
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_scenario(self, scenario, env=()):
+        """Runs scenario on a storage of a scratch database"""
+        from models.engine.async_db_storage import AsyncDBStorage
+
+        async def task():
+            storage = AsyncDBStorage()
+            try:
+                return await scenario(storage)
+            finally:
+                await storage.close()
+                await storage.dispose()
+
+        with patch.dict(os.environ, {'HBNB_DB_ASYNC_URL': self.url,
+                                     **dict(env)}):
+            return asyncio.run(task())
+
+    @staticmethod
+    async def version(storage):
+        """Returns the schema version recorded in the database"""
+        engine = storage._AsyncDBStorage__engine
+        async with engine.connect() as conn:
+            return await conn.run_sync(migrations.current_version)
+
+    def test_reload_creates_schema(self):
+        async def scenario(storage):
+            await storage.reload()
+            return await self.version(storage), await storage.migrate()
+
+        self.assertEqual(self.run_scenario(scenario),
+                         (migrations.LATEST, []))
+
+    def test_reload_migrates(self):
+        async def scenario(storage):
+            await storage.migrate()
+            engine = storage._AsyncDBStorage__engine
+            async with engine.begin() as conn:
+                await conn.run_sync(migrations.stamp, 1)
+            await storage.reload()
+            return await self.version(storage)
+
+        self.assertEqual(self.run_scenario(scenario), migrations.LATEST)
+
+    def test_reload_drops_when_testing(self):
+        async def scenario(storage):
+            await storage.reload()
+            storage.new(State(name="Tafilalet"))
+            await storage.save()
+            await storage.close()
+            await storage.reload()
+            return await storage.count(State), await self.version(storage)
+
+        self.assertEqual(self.run_scenario(scenario, {'HBNB_ENV': 'test'}),
+                         (0, migrations.LATEST))
@@ -8,9 +8,11 @@ import unittest
 """
 import unittest
 import os
+import uuid
 import inspect
 import pep8
 import models
+from models.base_model import BaseModel
 from models.engine.db_storage import DBStorage
 from models.amenity import Amenity
 from models.city import City
@@ -208,14 +210,14 @@ class TestWithUser(unittest.TestCase):
         self.storage = storage
 
     def test_new_method(self):
-        obj = User(email='john_doe@baz.com', password='mlmlml',
+        obj = User(email=f'john_doe_{uuid.uuid4()}@baz.com', password='mlmlml',
                    first_name='John', last_name='Doe')
         self.storage.new(obj)
         self.assertIn("User." + obj.id, self.storage.all().keys())
         self.assertIn(obj, self.storage.all().values())
 
     def test_save_method(self):
-        obj = User(email='john_doe@baz.com', password='mlmlml',
+        obj = User(email=f'john_doe_{uuid.uuid4()}@baz.com', password='mlmlml',
                    first_name='John', last_name='Doe')
         self.storage.new(obj)
         self.storage.save()
@@ -223,7 +225,7 @@ class TestWithUser(unittest.TestCase):
         self.assertIn(obj, self.storage.all().values())
 
     def test_reload_method(self):
-        obj = User(email='john_doe@baz.com', password='mlmlml',
+        obj = User(email=f'john_doe_{uuid.uuid4()}@baz.com', password='mlmlml',
                    first_name='John', last_name='Doe')
         key = "User." + obj.id
 
@@ -325,7 +327,8 @@ class TestWithPlace(unittest.TestCase):
         self.san_jose = City(name='San Jose', state_id=self.arizona.id)
         self.san_jose.save()
 
-        self.john_doe = User(email='john_doe@baz.com', password='mlmlml',
+        self.john_doe = User(email=f'john_doe_{uuid.uuid4()}@baz.com',
+                             password='mlmlml',
                              first_name='John', last_name='Doe')
         self.john_doe.save()
 
@@ -441,7 +444,8 @@ class TestWithReview(unittest.TestCase):
         self.san_jose = City(name='San Jose', state_id=self.arizona.id)
         self.san_jose.save()
 
-        self.john_doe = User(email='john_doe@baz.com', password='mlmlml',
+        self.john_doe = User(email=f'john_doe_{uuid.uuid4()}@baz.com',
+                             password='mlmlml',
                              first_name='John', last_name='Doe')
         self.john_doe.save()
 
@@ -480,5 +484,527 @@ class TestWithReview(unittest.TestCase):
         self.assertEqual(storage_objs[key].text, 'Excellent')
 
 
+@unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') != 'db', 'Using FileStorage')
+class TestBatch(unittest.TestCase):
+    """testing the deferred commits of DBStorage.batch()"""
+
+    def setUp(self):
+        from models import storage
+        self.storage = storage
+
+    def test_batch_commits_once(self):
+        with self.storage.batch():
+            state = State(name="Tafilalet")
+            state.save()
+            city = City(name="Arfoud", state_id=state.id)
+            city.save()
+
+        self.storage.reload()
+        storage_objs = self.storage.all()
+
+        self.assertIn("State." + state.id, storage_objs)
+        self.assertIn("City." + city.id, storage_objs)
+
+    def test_batch_error(self):
+        with self.assertRaises(ValueError):
+            with self.storage.batch():
+                state = State(name="Tafilalet")
+                state.save()
+                raise ValueError
+
+        self.assertNotIn("State." + state.id, self.storage.all())
+
+
 if __name__ == "__main__":
     unittest.main()
+
+
+@unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') != 'db', 'Using FileStorage')
+class TestGeoIndex(unittest.TestCase):
+    """testing the spatial place index kept by DBStorage"""
+
+    def setUp(self):
+        self.state = State(name="Tafilalet")
+        self.city = City(name="Erfoud", state_id=self.state.id)
+        self.user = User(email="a@b.c", password="pwd")
+        self.place = Place(city_id=self.city.id, user_id=self.user.id,
+                           name="Kasbah", latitude=31.4337,
+                           longitude=-4.2304)
+        for obj in (self.state, self.city, self.user, self.place):
+            obj.save()
+
+    def tearDown(self):
+        for obj in (self.place, self.user, self.city, self.state):
+            models.storage.delete(obj)
+
+    def test_follows_commits(self):
+        index = models.storage.geo_index()
+        self.assertIn(self.place.id,
+                      [_id for dist, _id in index.within(31.43, -4.23, 5)])
+
+        self.place.latitude = 40.0
+        self.place.save()
+        self.assertNotIn(self.place.id,
+                         [_id for dist, _id in index.within(31.43, -4.23, 5)])
+
+
+@unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') != 'db', 'Using FileStorage')
+class TestPlacesWithAmenities(unittest.TestCase):
+    """testing the amenity filters of DBStorage"""
+
+    def setUp(self):
+        self.state = State(name="Tafilalet")
+        self.city = City(name="Erfoud", state_id=self.state.id)
+        self.user = User(email="a@b.c", password="pwd")
+        self.wifi = Amenity(name="Wifi")
+        self.pool = Amenity(name="Pool")
+        self.kasbah = Place(city_id=self.city.id, user_id=self.user.id,
+                            name="Kasbah")
+        self.riad = Place(city_id=self.city.id, user_id=self.user.id,
+                          name="Riad")
+        self.kasbah.amenities.extend([self.wifi, self.pool])
+        self.riad.amenities.append(self.wifi)
+        self.objs = (self.state, self.city, self.user, self.wifi,
+                     self.pool, self.kasbah, self.riad)
+        for obj in self.objs:
+            obj.save()
+
+    def tearDown(self):
+        for obj in reversed(self.objs):
+            models.storage.delete(obj)
+
+    def test_filters(self):
+        places = models.storage.places_with_amenities(
+            all_of=[self.wifi.id, self.pool.id])
+        self.assertEqual(places, [self.kasbah])
+
+        places = models.storage.places_with_amenities(any_of=[self.wifi.id])
+        self.assertCountEqual(places, [self.kasbah, self.riad])
+
+    def test_unlink_amenities(self):
+        models.storage.unlink_amenities(self.kasbah, [self.wifi.id])
+
+        self.assertEqual(self.kasbah.amenities, [self.pool])
+        places = models.storage.places_with_amenities(any_of=[self.wifi.id])
+        self.assertEqual(places, [self.riad])
+
+
+@unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') != 'db', 'Using FileStorage')
+class TestBulkNew(unittest.TestCase):
+    """testing bulk_new of DBStorage"""
+
+    def test_bulk_new(self):
+        states = [State(name=f"State {i}") for i in range(25)]
+        count = len(models.storage.all(State))
+
+        self.assertEqual(models.storage.bulk_new(states, chunk_size=10), 25)
+        self.assertEqual(len(models.storage.all(State)), count + 25)
+        for state in states:
+            models.storage.delete(models.storage.all(State)[
+                f"State.{state.id}"])
+
+    def test_save_after_bulk_new(self):
+        states = [State(name=f"State {i}") for i in range(3)]
+        models.storage.bulk_new(states, chunk_size=2)
+
+        states[0].name = "Souss"
+        states[0].save()
+        states[1].delete()
+        models.storage.close()
+
+        self.assertEqual(models.storage.get(State, states[0].id).name,
+                         "Souss")
+        self.assertIsNone(models.storage.get(State, states[1].id))
+        models.storage.delete(models.storage.get(State, states[0].id))
+        models.storage.delete(models.storage.get(State, states[2].id))
+
+    def test_bulk_new_rolls_back(self):
+        def states():
+            yield State(name="Fine")
+            raise ValueError("bad line")
+
+        count = len(models.storage.all(State))
+        with self.assertRaises(ValueError):
+            models.storage.bulk_new(states())
+        self.assertEqual(len(models.storage.all(State)), count)
+
+
+@unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') != 'db', 'Using FileStorage')
+class TestGetCount(unittest.TestCase):
+    """testing get and count of DBStorage"""
+
+    def test_get(self):
+        state = State(name="Tafilalet")
+        state.save()
+
+        self.assertIs(models.storage.get(State, state.id), state)
+        self.assertIsNone(models.storage.get(State, "missing"))
+        models.storage.delete(state)
+
+    def test_count(self):
+        count = models.storage.count()
+        states_count = models.storage.count(State)
+        state = State(name="Tafilalet")
+        state.save()
+
+        self.assertEqual(models.storage.count(), count + 1)
+        self.assertEqual(models.storage.count(State), states_count + 1)
+        models.storage.delete(state)
+
+    def test_unmapped_class(self):
+        state = State(name="Tafilalet")
+        state.save()
+
+        self.assertIsNone(models.storage.get(BaseModel, state.id))
+        self.assertEqual(models.storage.count(BaseModel), 0)
+        self.assertEqual(list(models.storage.iter(BaseModel)), [])
+        self.assertEqual(models.storage.all(BaseModel), {})
+        models.storage.delete(state)
+
+    def test_iter(self):
+        state = State(name="Tafilalet")
+        state.save()
+
+        states = list(models.storage.iter(State, batch_size=2))
+        self.assertEqual(len(states), models.storage.count(State))
+        self.assertEqual(list(models.storage.iter(
+            State, where={"id": state.id})), [state])
+        models.storage.delete(state)
+
+
+@unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') != 'db', 'Using FileStorage')
+class TestSessions(unittest.TestCase):
+    """testing the per-thread sessions and pool of DBStorage"""
+
+    def test_session_per_thread(self):
+        import threading
+
+        sessions = []
+        main = models.storage._DBStorage__session()
+
+        def work():
+            sessions.append(models.storage._DBStorage__session())
+            models.storage.count(State)
+            models.storage.close()
+
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+        self.assertIsNot(sessions[0], main)
+
+    def test_close(self):
+        state = State(name="Tafilalet")
+        state.save()
+        session = models.storage._DBStorage__session()
+
+        models.storage.close()
+        self.assertIsNot(models.storage._DBStorage__session(), session)
+        self.assertEqual(models.storage.get(State, state.id).name,
+                         "Tafilalet")
+        models.storage.delete(models.storage.get(State, state.id))
+
+    def test_pool_stats(self):
+        checkouts = models.storage.pool_stats()['checkouts']
+        models.storage.close()
+        models.storage.count(State)
+
+        stats = models.storage.pool_stats()
+        self.assertGreater(stats['checkouts'], checkouts)
+        self.assertGreaterEqual(stats['peak_checked_out'], 1)
+
+
+@unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') != 'db', 'Using FileStorage')
+class TestCache(unittest.TestCase):
+    """testing the identity map bounds of DBStorage"""
+
+    def test_clear_cache(self):
+        state = State(name="Souss")
+        other = State(name="Draa")
+        city = City(name="Zagora", state_id=other.id)
+        for obj in (state, other, city):
+            obj.save()
+        models.storage.close()
+
+        kept = models.storage.get(State, state.id)
+        # the city and its state only refer to each other
+        models.storage.get(City, city.id).state.cities
+        models.storage.clear_cache()
+        session = models.storage._DBStorage__session()
+        self.assertEqual(list(session.identity_map.values()), [kept])
+        self.assertEqual(kept.name, "Souss")
+        models.storage.delete(models.storage.get(City, city.id))
+        for obj in (other, state):
+            models.storage.delete(models.storage.get(State, obj.id))
+
+    def test_save_after_clear(self):
+        state = State(name="Souss")
+        state.save()
+        models.storage.clear_cache()
+        models.storage.all(State)
+
+        state.name = "Souss-Massa"
+        state.save()
+        models.storage.close()
+        self.assertEqual(models.storage.get(State, state.id).name,
+                         "Souss-Massa")
+        models.storage.delete(models.storage.get(State, state.id))
+        self.assertIsNone(models.storage.get(State, state.id))
+
+    def test_cache_max(self):
+        state = State(name="Souss")
+        state.save()
+        models.storage.bulk_new(City(name=f"City {i}", state_id=state.id)
+                                for i in range(4))
+        models.storage.close()
+        storage_class = type(models.storage)
+        storage_class._DBStorage__cache_max = 2
+        try:
+            kept = models.storage.get(State, state.id)
+            for _ in range(3):
+                models.storage.all(City)
+            session = models.storage._DBStorage__session()
+            self.assertIn(kept, session)
+            self.assertEqual(len(kept.cities), 4)
+        finally:
+            storage_class._DBStorage__cache_max = 0
+        models.storage.delete(kept)
+
+
+@unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') != 'db', 'Using FileStorage')
+class TestEagerLoading(unittest.TestCase):
+    """testing the load argument of DBStorage"""
+
+    def setUp(self):
+        self.state = State(name="Draa")
+        self.user = User(email="draa@mail.com", password="pwd")
+        self.amenities = [Amenity(name="Wifi"), Amenity(name="Pool")]
+        self.cities = [City(name=f"City {i}", state_id=self.state.id)
+                       for i in range(100)]
+        places = [Place(name=f"Place {i}", city_id=city.id,
+                        user_id=self.user.id)
+                  for i, city in enumerate(self.cities)]
+        for place in places:
+            place.amenities.extend(self.amenities)
+        for obj in [self.state, self.user] + self.cities + places:
+            models.storage.new(obj)
+        models.storage.save()
+        models.storage.close()
+
+    def tearDown(self):
+        models.storage.close()
+        for obj in [self.user, self.state] + self.amenities:
+            models.storage.delete(models.storage.get(type(obj), obj.id))
+
+    def queries(self, func):
+        """Returns the number of queries of func rendering the state"""
+        from sqlalchemy import event
+
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = models.storage._DBStorage__engine
+        event.listen(engine, 'before_cursor_execute', count)
+        try:
+            state = func()
+            names = [amenity.name for city in state.cities
+                     for place in city.places
+                     for amenity in place.amenities]
+        finally:
+            event.remove(engine, 'before_cursor_execute', count)
+            models.storage.close()
+        self.assertEqual(len(names), 200)
+        return len(statements)
+
+    def test_lazy(self):
+        self.assertGreater(self.queries(
+            lambda: models.storage.get(State, self.state.id)), 200)
+
+    def test_selectin(self):
+        load = ['cities.places.amenities']
+        self.assertEqual(self.queries(
+            lambda: models.storage.get(State, self.state.id, load)), 4)
+        self.assertEqual(self.queries(
+            lambda: models.storage.all(State, load)
+            [f'State.{self.state.id}']), 4)
+        self.assertEqual(self.queries(
+            lambda: next(models.storage.iter(
+                State, where={'id': self.state.id}, load=load))), 4)
+
+    def test_joined(self):
+        load = {'cities': 'joined', 'cities.places': 'joined'}
+        self.assertEqual(self.queries(
+            lambda: models.storage.get(State, self.state.id, load)), 101)
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            models.storage.get(State, self.state.id, {'cities': 'eager'})
+        with self.assertRaises(AttributeError):
+            models.storage.get(State, self.state.id, ['towns'])
+
+
+@unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') != 'db', 'Using FileStorage')
+class TestEngine(unittest.TestCase):
+    """testing the engine settings of DBStorage"""
+
+    def test_foreign_keys(self):
+        from sqlalchemy.exc import IntegrityError
+
+        city = City(name="Erfoud", state_id="missing")
+        with self.assertRaises(IntegrityError):
+            city.save()
+        models.storage.close()
+        self.assertIsNone(models.storage.get(City, city.id))
+
+    @unittest.skipUnless(str(os.getenv('HBNB_DB_URL')).startswith('sqlite'),
+                         'Not using SQLite')
+    def test_sqlite_pragmas(self):
+        from sqlalchemy import text
+
+        session = models.storage._DBStorage__session
+        pragmas = {pragma: session.execute(
+                       text(f'PRAGMA {pragma}')).scalar()
+                   for pragma in ('journal_mode', 'foreign_keys')}
+        self.assertEqual(pragmas, {'journal_mode': 'wal',
+                                   'foreign_keys': 1})
+
+
+@unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') != 'db', 'Using FileStorage')
+class TestIndexes(unittest.TestCase):
+    """testing the indexes of the models"""
+
+    def test_create_indexes(self):
+        from models.base_model import Base
+
+        engine = models.storage._DBStorage__engine
+        models.storage.close()
+        index = next(index for index in Base.metadata.tables[
+            'reviews'].indexes if index.name == 'ix_reviews_place_id')
+        index.drop(engine)
+
+        self.assertEqual(models.storage.create_indexes(),
+                         ['ix_reviews_place_id'])
+        self.assertEqual(models.storage.create_indexes(), [])
+
+    def test_unique_email(self):
+        from sqlalchemy.exc import IntegrityError
+
+        user = User(email="unique@mail.com", password="pwd")
+        user.save()
+        with self.assertRaises(IntegrityError):
+            User(email="unique@mail.com", password="pwd").save()
+        self.assertEqual(models.storage.count(User),
+                         len(models.storage.all(User)))
+        models.storage.delete(user)
+
+
+@unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') != 'db', 'Using FileStorage')
+class TestMigrations(unittest.TestCase):
+    """testing the schema migrations of DBStorage"""
+
+    def test_reload_at_latest(self):
+        from unittest.mock import patch
+
+        with patch('models.engine.migrations.migrate') as migrate:
+            models.storage.reload()
+        migrate.assert_not_called()
+
+    def test_migrate_unversioned(self):
+        from sqlalchemy import inspect
+        from models.base_model import Base
+        from models.engine import migrations
+
+        engine = models.storage._DBStorage__engine
+        models.storage.close()
+        migrations.schema_version.drop(engine)
+        Base.metadata.tables['cities'].indexes.copy().pop().drop(engine)
+
+        self.assertEqual(models.storage.migrate(), [2])
+        self.assertEqual(models.storage.migrate(), [])
+        self.assertIn('ix_cities_state_id',
+                      [index['name'] for index in
+                       inspect(engine).get_indexes('cities')])
+        with engine.connect() as conn:
+            self.assertEqual(migrations.current_version(conn),
+                             migrations.LATEST)
+
+    def test_migrate_empty(self):
+        from sqlalchemy import create_engine, inspect
+        from models.base_model import Base
+        from models.engine import migrations
+
+        engine = create_engine('sqlite://')
+        with engine.begin() as conn:
+            self.assertEqual(migrations.current_version(conn), 0)
+            self.assertEqual(migrations.migrate(conn), [migrations.LATEST])
+            self.assertEqual(migrations.current_version(conn),
+                             migrations.LATEST)
+        self.assertTrue(set(Base.metadata.tables) <=
+                        set(inspect(engine).get_table_names()))
+
+
+@unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') != 'db', 'Using FileStorage')
+class TestReplicas(unittest.TestCase):
+    """testing the read replica routing of DBStorage, on SQLite files"""
+
+    def setUp(self):
+        import tempfile
+        from datetime import datetime
+        from unittest.mock import patch
+        from sqlalchemy import create_engine, insert
+        from models.engine import migrations
+
+        self.directory = tempfile.TemporaryDirectory()
+        path = self.directory.name
+        for name in ('replica_1', 'replica_2'):
+            engine = create_engine(f'sqlite:///{path}/{name}.db')
+            with engine.begin() as conn:
+                migrations.migrate(conn)
+                conn.execute(insert(State.__table__).values(
+                    id=name, name=name, created_at=datetime.now(),
+                    updated_at=datetime.now()))
+            engine.dispose()
+
+        urls = {'HBNB_DB_URL': f'sqlite:///{path}/primary.db',
+                'HBNB_DB_REPLICA_URLS': f'sqlite:///{path}/replica_1.db,'
+                                        f'sqlite:///{path}/missing/r.db,'
+                                        f'sqlite:///{path}/replica_2.db'}
+        with patch.dict(os.environ, urls):
+            self.storage = DBStorage()
+        self.storage.reload()
+
+    def tearDown(self):
+        self.storage.close()
+        self.directory.cleanup()
+
+    def names(self):
+        """Returns the names of the states a new session reads"""
+        self.storage.close()
+        return [state.name for state in self.storage.all(State).values()]
+
+    def test_round_robin(self):
+        self.assertEqual([self.names() for _ in range(4)],
+                         [['replica_1'], ['replica_2'],
+                          ['replica_2'], ['replica_1']])
+
+    def test_read_your_writes(self):
+        self.storage.close()
+        state = State(name="Oriental")
+        self.storage.new(state)
+        self.storage.save()
+
+        self.assertIs(self.storage.get(State, state.id), state)
+        self.assertEqual(self.storage.count(State), 1)
+        self.assertNotIn("Oriental", self.names())
+
+    def test_text_writes(self):
+        from sqlalchemy import text
+
+        self.storage.close()
+        session = self.storage._DBStorage__session()
+        session.execute(text("UPDATE states SET name = 'Renamed'"))
+        session.commit()
+
+        self.assertEqual(sorted(self.names() + self.names()),
+                         ['replica_1', 'replica_2'])
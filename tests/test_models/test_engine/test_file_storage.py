@@ -9,7 +9,9 @@ import models
 import unittest
 import os
 import shutil
+from unittest.mock import patch
 from models.engine.file_storage import FileStorage
+from models.engine.serializers import BinarySerializer, JSONSerializer
 from models.base_model import BaseModel
 from models.user import User
 from models.state import State
@@ -18,6 +20,11 @@ from models.place import Place
 from models.amenity import Amenity
 from models.review import Review
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') == 'db', 'Using DBStorage')
 class TestClass_instantiation(unittest.TestCase):
@@ -59,6 +66,10 @@ class TestMethods(unittest.TestCase):
             FileStorage._FileStorage__file_path = "file.json"
         except IOError:
             pass
+        try:
+            os.remove("temp.bak")
+        except IOError:
+            pass
         FileStorage._FileStorage__objects = {}
 
     def test_all_return_type(self):
@@ -106,6 +117,111 @@ class TestMethods(unittest.TestCase):
         self.assertIn(errachidia, cities_objs.values())
         self.assertIn(arfoud, cities_objs.values())
 
+    def test_get(self):
+        tafilalet = State(name="Tafilalet")
+        tafilalet.save()
+
+        self.assertIs(models.storage.get(State, tafilalet.id), tafilalet)
+        self.assertIs(models.storage.get(State, tafilalet.id,
+                                         load=['cities']), tafilalet)
+        self.assertIsNone(models.storage.get(City, tafilalet.id))
+        self.assertIsNone(models.storage.get(State, "missing"))
+
+    def test_count(self):
+        count = models.storage.count()
+        states_count = models.storage.count(State)
+        State(name="Tafilalet").save()
+        City(name="Arfoud").save()
+
+        self.assertEqual(models.storage.count(), count + 2)
+        self.assertEqual(models.storage.count(State), states_count + 1)
+        self.assertEqual(models.storage.count(State),
+                         len(models.storage.all(State)))
+        self.assertEqual(models.storage.count(BaseModel),
+                         len(models.storage.all()))
+
+    def test_iter(self):
+        tafilalet = State(name="Tafilalet")
+        arfoud = City(name="Arfoud", state_id=tafilalet.id)
+        rissani = City(name="Rissani", state_id=tafilalet.id)
+        for obj in (tafilalet, arfoud, rissani):
+            obj.save()
+
+        self.assertCountEqual(list(models.storage.iter(State)),
+                              models.storage.all(State).values())
+        self.assertCountEqual(list(models.storage.iter()),
+                              models.storage.all().values())
+        where = {"state_id": tafilalet.id, "name": "Arfoud"}
+        self.assertEqual(list(models.storage.iter(City, where=where)),
+                         [arfoud])
+
+    def test_iter_while_deleting(self):
+        for i in range(5):
+            State(name=f"State {i}").save()
+
+        with models.storage.batch():
+            for state in models.storage.iter(State):
+                models.storage.delete(state)
+        self.assertEqual(models.storage.count(State), 0)
+
+    def test_close(self):
+        tafilalet = State(name="Tafilalet")
+        tafilalet.save()
+        models.storage.close()
+
+        self.assertIs(models.storage.get(State, tafilalet.id), tafilalet)
+
+    def test_all_method_class_copy(self):
+        from models import storage
+
+        state = State(name="Guelmim")
+        storage.new(state)
+        states_objs = storage.all(State)
+
+        self.assertIn("State." + state.id, states_objs)
+        states_objs["State.fake"] = state
+        self.assertNotIn("State.fake", storage.all(State))
+
+        storage.delete(state)
+        self.assertIn("State." + state.id, states_objs)
+        self.assertNotIn("State." + state.id, storage.all(State))
+
+    def test_delete_while_iterating_all(self):
+        from models import storage
+
+        for name in ("Guelmim", "Souss"):
+            storage.new(State(name=name))
+        for state in storage.all(State).values():
+            state.delete()
+
+        self.assertEqual(storage.all(State), {})
+
+    def test_all_method_base_class(self):
+        from models import storage
+
+        state = State(name="Souss")
+        city = City(name="Agadir", state_id=state.id)
+        storage.new(state)
+        storage.new(city)
+
+        base_objs = storage.all(BaseModel)
+
+        self.assertIn(state, base_objs.values())
+        self.assertIn(city, base_objs.values())
+
+    def test_all_method_objects_replaced(self):
+        from models import storage
+
+        state = State(name="Draa")
+        storage.new(state)
+        saved_objs = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        try:
+            self.assertNotIn(state, storage.all(State).values())
+        finally:
+            FileStorage._FileStorage__objects = saved_objs
+        self.assertIn(state, storage.all(State).values())
+
     def test_new_method(self):
         base_m = BaseModel()
         models.storage.new(base_m)
@@ -134,6 +250,44 @@ class TestMethods(unittest.TestCase):
         with self.assertRaises(TypeError):
             models.storage.reload(None)
 
+    def test_save_after_setting_attribute(self):
+        state = State(name="Tafilalet")
+        state.save()
+
+        state.name = "Oriental"
+        self.assertEqual(models.storage.dirty_count(), 1)
+        models.storage.save()
+        with open(FileStorage._FileStorage__file_path, "r") as f:
+            self.assertIn("Oriental", f.read())
+
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(models.storage.get(State, state.id).name, "Oriental")
+
+    def test_save_after_linking_amenity(self):
+        place = Place(name="Kasbah")
+        wifi = Amenity(name="Wifi")
+        place.save()
+        wifi.save()
+
+        place.amenities = wifi
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(models.storage.get(Place, place.id).amenity_ids,
+                         [wifi.id])
+
+    def test_setting_foreign_key_reindexes(self):
+        tafilalet = State(name="Tafilalet")
+        oriental = State(name="Oriental")
+        city = City(name="Figuig", state_id=tafilalet.id)
+        for obj in (tafilalet, oriental, city):
+            obj.save()
+
+        city.state_id = oriental.id
+        self.assertEqual(tafilalet.cities, [])
+        self.assertEqual(oriental.cities, [city])
+
     def test_delete(self):
         from models import storage
 
@@ -168,6 +322,939 @@ class TestMethods(unittest.TestCase):
         self.assertIn(arfoud, dict_objs.values())
 
 
+@unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') == 'db', 'Using DBStorage')
+class TestRelated(unittest.TestCase):
+    """testing the foreign key reverse indexes of FileStorage"""
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            shutil.copy2("file.json", "temp")
+            FileStorage._FileStorage__file_path = "temp"
+        except IOError:
+            pass
+
+    @classmethod
+    def tearDownClass(cls):
+        try:
+            os.remove("temp")
+            FileStorage._FileStorage__file_path = "file.json"
+        except IOError:
+            pass
+        try:
+            os.remove("temp.bak")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_state_cities(self):
+        tafilalet = State(name="Tafilalet")
+        oriental = State(name="Oriental")
+        errachidia = City(name="Errachidia", state_id=tafilalet.id)
+        tafilalet.save()
+        oriental.save()
+        errachidia.save()
+
+        self.assertEqual(tafilalet.cities, [errachidia])
+        self.assertEqual(oriental.cities, [])
+
+        errachidia.state_id = oriental.id
+        errachidia.save()
+
+        self.assertEqual(tafilalet.cities, [])
+        self.assertEqual(oriental.cities, [errachidia])
+
+        errachidia.delete()
+
+        self.assertEqual(oriental.cities, [])
+
+    def test_place_and_user_relations(self):
+        user = User(email="a@b.c", password="pwd")
+        city = City(name="Arfoud")
+        place = Place(name="Kasbah", city_id=city.id, user_id=user.id)
+        review = Review(text="Great", place_id=place.id, user_id=user.id)
+        for obj in (user, city, place, review):
+            obj.save()
+
+        self.assertEqual(city.places, [place])
+        self.assertEqual(user.places, [place])
+        self.assertEqual(user.reviews, [review])
+        self.assertEqual(place.reviews, [review])
+
+    def test_related_after_reload(self):
+        state = State(name="Fes-Meknes")
+        city = City(name="Ifrane", state_id=state.id)
+        state.save()
+        city.save()
+        models.storage.reload()
+
+        reloaded = models.storage.all(State)["State." + state.id]
+
+        self.assertEqual([c.id for c in reloaded.cities], [city.id])
+
+    def test_related_unindexed_attribute(self):
+        state = State(name="Rabat-Sale")
+        state.save()
+
+        found = models.storage.related(State, 'name', "Rabat-Sale")
+
+        self.assertIn(state, found)
+
+
+@unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') == 'db', 'Using DBStorage')
+class TestJournal(unittest.TestCase):
+    """testing the append-only journal mode of FileStorage"""
+
+    def setUp(self):
+        FileStorage._FileStorage__file_path = "temp"
+        FileStorage._FileStorage__journal = True
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        for path in ("temp", "temp.bak", "temp.journal"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        FileStorage._FileStorage__file_path = "file.json"
+        FileStorage._FileStorage__journal = False
+        FileStorage._FileStorage__journal_max = 1024 * 1024
+        FileStorage._FileStorage__objects = {}
+
+    def test_save_appends(self):
+        state = State(name="Tafilalet")
+        state.save()
+        city = City(name="Arfoud", state_id=state.id)
+        city.save()
+
+        self.assertFalse(os.path.exists("temp"))
+        with open("temp.journal", "r") as f:
+            lines = [line for line in f if '"upsert"' in line]
+        self.assertEqual(len(lines), 2)
+        self.assertIn("State." + state.id, lines[0])
+        self.assertIn("City." + city.id, lines[1])
+
+    def test_reload_replays(self):
+        state = State(name="Tafilalet")
+        city = City(name="Arfoud", state_id=state.id)
+        state.save()
+        city.save()
+        state.name = "Draa-Tafilalet"
+        state.save()
+        city.delete()
+
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        storage_objs = FileStorage._FileStorage__objects
+
+        self.assertEqual(storage_objs["State." + state.id].name,
+                         "Draa-Tafilalet")
+        self.assertNotIn("City." + city.id, storage_objs)
+
+    def test_reload_torn_record(self):
+        state = State(name="Tafilalet")
+        state.save()
+        with open("temp.journal", "a") as f:
+            f.write('{"op": "upsert", "key": "State.')
+
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+
+        self.assertIn("State." + state.id, FileStorage._FileStorage__objects)
+
+    def test_save_after_torn_record(self):
+        state = State(name="Tafilalet")
+        state.save()
+        with open("temp.journal", "a") as f:
+            f.write('{"op": "upsert", "key": "State.')
+
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        city = City(name="Arfoud", state_id=state.id)
+        city.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+
+        storage_objs = FileStorage._FileStorage__objects
+        self.assertIn("State." + state.id, storage_objs)
+        self.assertIn("City." + city.id, storage_objs)
+
+    def test_compaction(self):
+        FileStorage._FileStorage__journal_max = 1
+        state = State(name="Tafilalet")
+        state.save()
+
+        self.assertFalse(os.path.exists("temp.journal"))
+        with open("temp", "r") as f:
+            self.assertIn("State." + state.id, f.read())
+
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+
+        self.assertIn("State." + state.id, FileStorage._FileStorage__objects)
+
+    def test_snapshot_after_journal(self):
+        state = State(name="old")
+        state.save()
+        city = City(name="Arfoud", state_id=state.id)
+        city.save()
+
+        FileStorage._FileStorage__journal = False
+        state.name = "new"
+        state.save()
+        city.delete()
+        self.assertFalse(os.path.exists("temp.journal"))
+
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        storage_objs = FileStorage._FileStorage__objects
+        self.assertEqual(storage_objs["State." + state.id].name, "new")
+        self.assertNotIn("City." + city.id, storage_objs)
+
+        FileStorage._FileStorage__journal = True
+        storage_objs["State." + state.id].name = "newer"
+        storage_objs["State." + state.id].save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(FileStorage._FileStorage__objects[
+            "State." + state.id].name, "newer")
+
+    def test_dirty_count(self):
+        models.storage.save()
+        self.assertEqual(models.storage.dirty_count(), 0)
+
+        state = State(name="Tafilalet")
+        city = City(name="Arfoud", state_id=state.id)
+        models.storage.new(state)
+        models.storage.new(city)
+        self.assertEqual(models.storage.dirty_count(), 2)
+
+        models.storage.save()
+        self.assertEqual(models.storage.dirty_count(), 0)
+
+
+@unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') == 'db', 'Using DBStorage')
+class TestBatch(unittest.TestCase):
+    """testing the deferred saves of FileStorage.batch()"""
+
+    def setUp(self):
+        FileStorage._FileStorage__file_path = "temp"
+        FileStorage._FileStorage__objects = {}
+        # start with nothing pending, which batch() saves on entry
+        models.storage.save()
+        os.remove("temp")
+
+    def tearDown(self):
+        for path in ("temp", "temp.bak"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        FileStorage._FileStorage__file_path = "file.json"
+        FileStorage._FileStorage__objects = {}
+
+    def test_batch_saves_once(self):
+        with models.storage.batch():
+            state = State(name="Tafilalet")
+            state.save()
+            city = City(name="Arfoud", state_id=state.id)
+            city.save()
+            self.assertFalse(os.path.exists("temp"))
+            self.assertEqual(models.storage.dirty_count(), 2)
+
+        self.assertEqual(models.storage.dirty_count(), 0)
+        with open("temp", "r") as f:
+            content = f.read()
+            self.assertIn("State." + state.id, content)
+            self.assertIn("City." + city.id, content)
+
+    def test_batch_nested(self):
+        with models.storage.batch():
+            with models.storage.batch():
+                State(name="Tafilalet").save()
+            self.assertFalse(os.path.exists("temp"))
+        self.assertTrue(os.path.exists("temp"))
+
+    def test_batch_error(self):
+        kept = State(name="Souss")
+        gone = State(name="Draa")
+        kept.save()
+        gone.save()
+        with self.assertRaises(ValueError):
+            with models.storage.batch():
+                new = State(name="Tafilalet")
+                new.save()
+                kept.name = "Sahara"
+                kept.save()
+                models.storage.delete(gone)
+                raise ValueError
+
+        self.assertEqual(models.storage.dirty_count(), 0)
+        self.assertIsNone(models.storage.get(State, new.id))
+        self.assertEqual(models.storage.get(State, kept.id).name, "Souss")
+        self.assertEqual(models.storage.get(State, gone.id).name, "Draa")
+        models.storage.save()
+        with open("temp", "r") as f:
+            content = f.read()
+            self.assertNotIn("State." + new.id, content)
+            self.assertNotIn("Sahara", content)
+
+    def test_batch_error_journal(self):
+        FileStorage._FileStorage__journal = True
+        try:
+            state = State(name="Souss")
+            state.save()
+            state.name = "Draa"
+            with self.assertRaises(ValueError):
+                with models.storage.batch():
+                    state.name = "Sahara"
+                    models.storage.delete(state)
+                    raise ValueError
+        finally:
+            FileStorage._FileStorage__journal = False
+            os.remove("temp.journal")
+
+        self.assertEqual(models.storage.get(State, state.id).name, "Draa")
+
+    def test_batch_saves_pending(self):
+        state = State(name="Tafilalet")
+        models.storage.new(state)
+        with models.storage.batch():
+            self.assertTrue(os.path.exists("temp"))
+            self.assertEqual(models.storage.dirty_count(), 0)
+
+    def test_batch_other_thread_saves(self):
+        import threading
+
+        state = State(name="Tafilalet")
+        with models.storage.batch():
+            thread = threading.Thread(target=state.save)
+            thread.start()
+            thread.join()
+            self.assertTrue(os.path.exists("temp"))
+            self.assertEqual(models.storage.dirty_count(), 0)
+
+
+@unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') == 'db', 'Using DBStorage')
+class TestSnapshot(unittest.TestCase):
+    """testing the atomic snapshot writes of FileStorage"""
+
+    def setUp(self):
+        FileStorage._FileStorage__file_path = "temp"
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        for path in ("temp", "temp.bak", "temp.tmp"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        FileStorage._FileStorage__file_path = "file.json"
+        FileStorage._FileStorage__objects = {}
+
+    def test_previous_generation(self):
+        tafilalet = State(name="Tafilalet")
+        tafilalet.save()
+        oriental = State(name="Oriental")
+        oriental.save()
+
+        self.assertFalse(os.path.exists("temp.tmp"))
+        with open("temp.bak", "r") as f:
+            content = f.read()
+            self.assertIn("State." + tafilalet.id, content)
+            self.assertNotIn("State." + oriental.id, content)
+        with open("temp", "r") as f:
+            self.assertIn("State." + oriental.id, f.read())
+
+    def test_reload_torn_file(self):
+        tafilalet = State(name="Tafilalet")
+        tafilalet.save()
+        State(name="Oriental").save()
+        with open("temp", "w") as f:
+            f.write('{"State.')
+
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+
+        self.assertIn("State." + tafilalet.id,
+                      FileStorage._FileStorage__objects)
+
+    def test_reload_torn_file_without_backup(self):
+        State(name="Tafilalet").save()
+        with open("temp", "w") as f:
+            f.write('{"State.')
+
+        FileStorage._FileStorage__objects = {}
+        with self.assertRaises(ValueError):
+            models.storage.reload()
+
+        with open("temp.bak", "w") as f:
+            f.write('{"State.')
+        with self.assertRaises(ValueError):
+            models.storage.reload()
+
+
+@unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') == 'db', 'Using DBStorage')
+class TestLazyReload(unittest.TestCase):
+    """testing the lazy reload mode of FileStorage"""
+
+    def setUp(self):
+        FileStorage._FileStorage__file_path = "temp"
+        FileStorage._FileStorage__objects = {}
+
+        self.state = State(name="Tafilalet")
+        self.city = City(name="Arfoud", state_id=self.state.id)
+        self.state.save()
+        self.city.save()
+
+        FileStorage._FileStorage__lazy = True
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+
+    def tearDown(self):
+        for path in ("temp", "temp.bak"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        FileStorage._FileStorage__file_path = "file.json"
+        FileStorage._FileStorage__lazy = False
+        FileStorage._FileStorage__objects = {}
+
+    def test_reload_builds_nothing(self):
+        self.assertEqual(FileStorage._FileStorage__objects, {})
+
+    def test_reload_compact_records(self):
+        records = FileStorage._FileStorage__raw[City]
+        record = records["City." + self.city.id]
+
+        self.assertFalse(hasattr(record, "__dict__"))
+        self.assertEqual(record.get("state_id"), self.state.id)
+        self.assertEqual(record.to_dict()["name"], "Arfoud")
+
+    def test_built_object_keeps_extra_attributes(self):
+        user = User(email="a@b.c", password="pwd")
+        user.age = 22
+        user.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+
+        reloaded = models.storage.all(User)["User." + user.id]
+
+        self.assertEqual(reloaded.to_dict(), user.to_dict())
+        self.assertEqual(reloaded.age, 22)
+
+    def test_all_class_builds_class(self):
+        states_objs = models.storage.all(State)
+        storage_objs = FileStorage._FileStorage__objects
+
+        self.assertEqual(states_objs["State." + self.state.id].name,
+                         "Tafilalet")
+        self.assertIn("State." + self.state.id, storage_objs)
+        self.assertNotIn("City." + self.city.id, storage_objs)
+
+    def test_related_builds_matches(self):
+        state = models.storage.all(State)["State." + self.state.id]
+
+        self.assertEqual([city.id for city in state.cities], [self.city.id])
+        self.assertIn("City." + self.city.id,
+                      FileStorage._FileStorage__objects)
+
+    def test_all_builds_everything(self):
+        storage_objs = models.storage.all()
+
+        self.assertIn("State." + self.state.id, storage_objs)
+        self.assertIn("City." + self.city.id, storage_objs)
+
+    def test_save_keeps_raw_records(self):
+        models.storage.all(State)["State." + self.state.id].save()
+
+        FileStorage._FileStorage__lazy = False
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        storage_objs = FileStorage._FileStorage__objects
+
+        self.assertIn("State." + self.state.id, storage_objs)
+        self.assertEqual(storage_objs["City." + self.city.id].name, "Arfoud")
+
+    def test_get_builds_one(self):
+        city = models.storage.get(City, self.city.id)
+
+        self.assertEqual(city.name, "Arfoud")
+        self.assertEqual(list(FileStorage._FileStorage__objects),
+                         ["City." + self.city.id])
+
+    def test_count_builds_nothing(self):
+        self.assertEqual(models.storage.count(), 2)
+        self.assertEqual(models.storage.count(City), 1)
+        self.assertEqual(FileStorage._FileStorage__objects, {})
+
+    def test_iter_keeps_nothing(self):
+        cities = list(models.storage.iter(City, where={"name": "Arfoud"}))
+
+        self.assertEqual([city.id for city in cities], [self.city.id])
+        self.assertEqual(list(models.storage.iter(City,
+                                                  where={"name": "Erfoud"})),
+                         [])
+        self.assertEqual(FileStorage._FileStorage__objects, {})
+
+    def test_delete_while_iterating(self):
+        for name in ("Erfoud", "Rissani"):
+            City(name=name, state_id=self.state.id).save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+
+        for city in models.storage.iter(City):
+            city.delete()
+
+        self.assertEqual(models.storage.count(City), 0)
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(models.storage.count(City), 0)
+        self.assertEqual(models.storage.count(State), 1)
+
+    def test_change_while_iterating(self):
+        models.storage.save()
+        for city in models.storage.iter(City):
+            city.name = "Erfoud"
+
+        self.assertEqual(models.storage.dirty_count(), 1)
+        self.assertEqual(models.storage.count(City), 1)
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(models.storage.get(City, self.city.id).name,
+                         "Erfoud")
+
+    def test_new_replaces_raw_record(self):
+        city = City(id=self.city.id, name="Rissani", state_id=self.state.id)
+        city.save()
+
+        self.assertEqual(models.storage.all(City)["City." + city.id], city)
+        self.assertEqual(len(models.storage.all(City)), 1)
+
+
+@unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') == 'db', 'Using DBStorage')
+class TestBinaryFormat(unittest.TestCase):
+    """testing the binary file format of FileStorage"""
+
+    def setUp(self):
+        FileStorage._FileStorage__file_path = "temp"
+        FileStorage._FileStorage__serializer = BinarySerializer()
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        for path in ("temp", "temp.bak", "temp.journal"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        FileStorage._FileStorage__file_path = "file.json"
+        FileStorage._FileStorage__serializer = JSONSerializer()
+        FileStorage._FileStorage__journal = False
+        FileStorage._FileStorage__objects = {}
+
+    def test_reload(self):
+        place = Place(name="Kasbah", max_guest=4, latitude=31.4)
+        place.amenity_ids = ["a", "b"]
+        place.save()
+
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        reloaded = FileStorage._FileStorage__objects["Place." + place.id]
+
+        self.assertEqual(reloaded.to_dict(), place.to_dict())
+        self.assertEqual(reloaded.created_at, place.created_at)
+
+    def test_file_is_binary(self):
+        State(name="Tafilalet").save()
+
+        with open("temp", "rb") as f:
+            self.assertEqual(f.read(5), BinarySerializer.magic)
+
+    def test_journal(self):
+        FileStorage._FileStorage__journal = True
+        state = State(name="Tafilalet")
+        city = City(name="Arfoud", state_id=state.id)
+        state.save()
+        city.save()
+        city.delete()
+        with open("temp.journal", "ab") as f:
+            f.write(b"\x80\x05")
+
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        storage_objs = FileStorage._FileStorage__objects
+
+        self.assertEqual(storage_objs["State." + state.id].name, "Tafilalet")
+        self.assertNotIn("City." + city.id, storage_objs)
+
+        review = Review(text="Great", place_id="p", user_id="u")
+        review.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertIn("Review." + review.id,
+                      FileStorage._FileStorage__objects)
+
+    def test_refuses_globals(self):
+        import pickle
+
+        with open("temp", "wb") as f:
+            f.write(BinarySerializer.magic)
+            f.write(pickle.dumps(State))
+
+        with open("temp", "rb") as f:
+            with self.assertRaises(ValueError):
+                BinarySerializer().load(f)
+
+
+@unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') == 'db', 'Using DBStorage')
+@unittest.skipIf(np is None, 'numpy is not installed')
+class TestPlaceColumns(unittest.TestCase):
+    """testing the columnar place store kept by FileStorage"""
+
+    def setUp(self):
+        FileStorage._FileStorage__file_path = "temp"
+        FileStorage._FileStorage__objects = {}
+
+        self.cheap = Place(city_id="c1", price_by_night=40, number_rooms=1,
+                           max_guest=2, latitude=31.9, longitude=-4.4)
+        self.dear = Place(city_id="c2", price_by_night=250, number_rooms=4,
+                          max_guest=8, latitude=33.9, longitude=-6.9)
+        self.cheap.save()
+        self.dear.save()
+        self.columns = models.storage.place_columns()
+
+    def tearDown(self):
+        for path in ("temp", "temp.bak"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        FileStorage._FileStorage__file_path = "file.json"
+        FileStorage._FileStorage__lazy = False
+        FileStorage._FileStorage__observers = []
+        FileStorage._FileStorage__objects = {}
+
+    def test_backfilled(self):
+        self.assertEqual(len(self.columns), 2)
+        self.assertIs(models.storage.place_columns(), self.columns)
+
+    def test_query(self):
+        query = self.columns.query
+
+        self.assertCountEqual(query(), [self.cheap.id, self.dear.id])
+        self.assertEqual(query(price_max=100), [self.cheap.id])
+        self.assertEqual(query(city_ids=["c2", "c3"]), [self.dear.id])
+        self.assertEqual(query(city_ids=["c3"]), [])
+        self.assertEqual(query(rooms_min=2, guests_min=6), [self.dear.id])
+        self.assertEqual(query(bbox=(31, -5, 32, -4)), [self.cheap.id])
+        self.assertEqual(query(price_min=100, city_ids=["c1"]), [])
+
+    def test_follows_updates(self):
+        self.cheap.price_by_night = 500
+        self.cheap.save()
+        place = Place(city_id="c1", price_by_night=10)
+        place.save()
+
+        self.assertCountEqual(self.columns.query(price_max=100), [place.id])
+
+        models.storage.delete(place)
+        self.assertEqual(self.columns.query(price_max=100), [])
+        self.assertEqual(len(self.columns), 2)
+
+    def test_grows(self):
+        for i in range(1500):
+            models.storage.new(Place(city_id="c3", price_by_night=i))
+
+        self.assertEqual(len(self.columns.query(city_ids=["c3"],
+                                                price_max=99)), 100)
+
+    def test_objects_replaced(self):
+        FileStorage._FileStorage__objects = {}
+        columns = models.storage.place_columns()
+        self.assertEqual(columns.query(), [])
+
+        models.storage.reload()
+        self.assertEqual(len(columns.query()), 2)
+
+    def test_lazy_records(self):
+        FileStorage._FileStorage__lazy = True
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+
+        self.assertEqual(self.columns.query(price_max=100), [self.cheap.id])
+        self.assertEqual(FileStorage._FileStorage__objects, {})
+
+
+@unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') == 'db', 'Using DBStorage')
+class TestGeoIndex(unittest.TestCase):
+    """testing the spatial place index kept by FileStorage"""
+
+    def setUp(self):
+        FileStorage._FileStorage__file_path = "temp"
+        FileStorage._FileStorage__objects = {}
+
+        self.erfoud = Place(latitude=31.4337, longitude=-4.2304)
+        self.rissani = Place(latitude=31.2811, longitude=-4.2644)
+        self.fiji = Place(latitude=-17.8, longitude=179.9)
+        for place in (self.erfoud, self.rissani, self.fiji):
+            place.save()
+
+    def tearDown(self):
+        for path in ("temp", "temp.bak"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        FileStorage._FileStorage__file_path = "file.json"
+        FileStorage._FileStorage__observers = []
+        FileStorage._FileStorage__objects = {}
+
+    def test_within(self):
+        matches = models.storage.geo_index().within(31.43, -4.23, 20)
+
+        self.assertEqual([_id for dist, _id in matches],
+                         [self.erfoud.id, self.rissani.id])
+        self.assertAlmostEqual(matches[1][0], 16.9, places=1)
+
+    def test_nearest(self):
+        index = models.storage.geo_index()
+
+        self.assertEqual(index.nearest(31.3, -4.26, 1)[0][1],
+                         self.rissani.id)
+        self.assertEqual([_id for dist, _id in index.nearest(0, 0, 5)],
+                         [self.rissani.id, self.erfoud.id, self.fiji.id])
+
+    def test_across_antimeridian(self):
+        matches = models.storage.geo_index().within(-17.8, -179.9, 50)
+
+        self.assertEqual([_id for dist, _id in matches], [self.fiji.id])
+
+    def test_follows_updates(self):
+        index = models.storage.geo_index()
+        self.erfoud.latitude = 40.0
+        self.erfoud.save()
+        models.storage.delete(self.rissani)
+        place = Place(latitude=31.5, longitude=-4.2)
+        place.save()
+
+        self.assertEqual([_id for dist, _id in index.within(31.43, -4.23, 20)],
+                         [place.id])
+        self.assertEqual(len(index), 3)
+
+    def test_lazy_records(self):
+        FileStorage._FileStorage__lazy = True
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        FileStorage._FileStorage__lazy = False
+
+        index = models.storage.geo_index()
+        self.assertEqual(len(index.within(31.43, -4.23, 20)), 2)
+        self.assertEqual(FileStorage._FileStorage__objects, {})
+
+
+@unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') == 'db', 'Using DBStorage')
+class TestAmenityIndex(unittest.TestCase):
+    """testing the amenity index of places kept by FileStorage"""
+
+    def setUp(self):
+        FileStorage._FileStorage__file_path = "temp"
+        FileStorage._FileStorage__objects = {}
+
+        self.wifi = Amenity(name="Wifi")
+        self.pool = Amenity(name="Pool")
+        self.tv = Amenity(name="TV")
+        self.kasbah = Place(name="Kasbah")
+        self.kasbah.amenity_ids = [self.wifi.id, self.pool.id]
+        self.riad = Place(name="Riad")
+        self.riad.amenity_ids = [self.wifi.id]
+        self.tent = Place(name="Tent")
+        self.tent.amenity_ids = []
+        for obj in (self.wifi, self.pool, self.tv,
+                    self.kasbah, self.riad, self.tent):
+            obj.save()
+
+    def tearDown(self):
+        for path in ("temp", "temp.bak"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        FileStorage._FileStorage__file_path = "file.json"
+        FileStorage._FileStorage__observers = []
+        FileStorage._FileStorage__objects = {}
+
+    def names(self, **filters):
+        places = models.storage.places_with_amenities(**filters)
+        return sorted(place.name for place in places)
+
+    def test_all_of(self):
+        self.assertEqual(self.names(all_of=[self.wifi.id]),
+                         ["Kasbah", "Riad"])
+        self.assertEqual(self.names(all_of=[self.wifi.id, self.pool.id]),
+                         ["Kasbah"])
+        self.assertEqual(self.names(all_of=[self.wifi.id, self.tv.id]), [])
+
+    def test_any_of(self):
+        self.assertEqual(self.names(any_of=[self.pool.id, self.tv.id]),
+                         ["Kasbah"])
+        self.assertEqual(self.names(all_of=[self.wifi.id],
+                                    any_of=[self.pool.id, self.tv.id]),
+                         ["Kasbah"])
+        self.assertEqual(self.names(), ["Kasbah", "Riad", "Tent"])
+
+    def test_follows_links(self):
+        self.kasbah.amenity_ids = [self.pool.id]
+        self.kasbah.save()
+        self.tent.amenity_ids = [self.wifi.id, self.tv.id]
+        self.tent.save()
+        models.storage.delete(self.riad)
+
+        self.assertEqual(self.names(all_of=[self.wifi.id]), ["Tent"])
+        self.assertEqual(self.names(any_of=[self.pool.id]), ["Kasbah"])
+
+    def test_amenities(self):
+        self.assertEqual(self.kasbah.amenities, [self.wifi, self.pool])
+
+    def test_amenities_setter(self):
+        self.tent.amenities = self.tv
+
+        self.assertEqual(self.names(all_of=[self.tv.id]), ["Tent"])
+
+    def test_amenity_ids_mutation(self):
+        models.storage.save()
+        self.tent.amenity_ids.append(self.tv.id)
+        self.kasbah.amenity_ids.remove(self.wifi.id)
+
+        self.assertEqual(models.storage.dirty_count(), 2)
+        self.assertEqual(self.names(all_of=[self.tv.id]), ["Tent"])
+        self.assertEqual(self.names(all_of=[self.wifi.id]), ["Riad"])
+        self.assertIn(f"'amenity_ids': ['{self.tv.id}']", str(self.tent))
+
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(self.names(all_of=[self.tv.id]), ["Tent"])
+
+    def test_unlink_amenities(self):
+        models.storage.unlink_amenities(self.kasbah, [self.wifi.id])
+
+        self.assertEqual(self.kasbah.amenity_ids, [self.pool.id])
+        self.assertEqual(self.names(all_of=[self.wifi.id]), ["Riad"])
+        self.assertEqual(self.names(any_of=[self.pool.id]), ["Kasbah"])
+
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(self.names(all_of=[self.wifi.id]), ["Riad"])
+
+
+@unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') == 'db', 'Using DBStorage')
+class TestLinkAmenities(unittest.TestCase):
+    """testing the amenity links of places in FileStorage"""
+
+    def setUp(self):
+        FileStorage._FileStorage__file_path = "temp"
+        FileStorage._FileStorage__objects = {}
+
+        self.wifi = Amenity(name="Wifi")
+        self.pool = Amenity(name="Pool")
+        self.wifi.save()
+        self.pool.save()
+
+    def tearDown(self):
+        for path in ("temp", "temp.bak"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        FileStorage._FileStorage__file_path = "file.json"
+        FileStorage._FileStorage__lazy = False
+        FileStorage._FileStorage__observers = []
+        FileStorage._FileStorage__objects = {}
+
+    def test_links_per_place(self):
+        kasbah = Place()
+        riad = Place()
+        kasbah.amenities = self.wifi
+        kasbah.amenities = self.wifi
+
+        self.assertEqual(kasbah.amenity_ids, [self.wifi.id])
+        self.assertEqual(riad.amenity_ids, [])
+
+    def test_link_amenities(self):
+        place = Place()
+        place.amenity_ids = [self.pool.id, self.pool.id]
+        models.storage.link_amenities(place, [self.wifi.id, self.pool.id])
+
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        reloaded = models.storage.all(Place)["Place." + place.id]
+
+        self.assertEqual(reloaded.amenity_ids, [self.pool.id, self.wifi.id])
+        self.assertEqual(reloaded.to_dict()["amenity_ids"],
+                         [self.pool.id, self.wifi.id])
+
+    def test_link_amenities_batch(self):
+        places = [Place() for _ in range(10)]
+        ids = [self.wifi.id, self.pool.id]
+
+        with patch.object(FileStorage, "_FileStorage__write_snapshot") as w:
+            with models.storage.batch():
+                for place in places:
+                    models.storage.link_amenities(place, ids)
+
+        self.assertEqual(w.call_count, 1)
+        self.assertEqual(len(models.storage.places_with_amenities(ids)), 10)
+
+    def test_lazy_records(self):
+        place = Place()
+        models.storage.link_amenities(place, [self.wifi.id])
+        FileStorage._FileStorage__lazy = True
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+
+        index = models.storage.amenity_index()
+        self.assertEqual(index.query([self.wifi.id]), {place.id})
+        self.assertEqual(index.query([self.pool.id]), set())
+
+
+@unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') == 'db', 'Using DBStorage')
+class TestBulkNew(unittest.TestCase):
+    """testing bulk_new of FileStorage"""
+
+    def setUp(self):
+        FileStorage._FileStorage__file_path = "temp"
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        for path in ("temp", "temp.bak"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        FileStorage._FileStorage__file_path = "file.json"
+        FileStorage._FileStorage__objects = {}
+
+    def test_bulk_new(self):
+        reviews = (Review(text=f"Review {i}") for i in range(100))
+
+        models.storage.save()
+        with patch.object(FileStorage, "_FileStorage__write_snapshot") as w:
+            self.assertEqual(models.storage.bulk_new(reviews), 100)
+        self.assertEqual(w.call_count, 1)
+        self.assertEqual(len(models.storage.all(Review)), 100)
+
+    def test_bulk_new_bad_input(self):
+        def reviews():
+            yield Review(text="Fine")
+            raise ValueError("bad line")
+
+        with self.assertRaises(ValueError):
+            models.storage.bulk_new(reviews())
+        self.assertEqual(len(models.storage.all(Review)), 0)
+
+
 @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') == 'db', 'Using DBStorage')
 class TestWithUser(unittest.TestCase):
     """testing that FileStorage class correctly handles User class"""
@@ -187,6 +1274,10 @@ class TestWithUser(unittest.TestCase):
             FileStorage._FileStorage__file_path = "file.json"
         except IOError:
             pass
+        try:
+            os.remove("temp.bak")
+        except IOError:
+            pass
         FileStorage._FileStorage__objects = {}
 
     def test_new_method(self):
@@ -237,6 +1328,10 @@ class TestWithState(unittest.TestCase):
             FileStorage._FileStorage__file_path = "file.json"
         except IOError:
             pass
+        try:
+            os.remove("temp.bak")
+        except IOError:
+            pass
         FileStorage._FileStorage__objects = {}
 
     def test_new_method(self):
@@ -287,6 +1382,10 @@ class TestWithCity(unittest.TestCase):
             FileStorage._FileStorage__file_path = "file.json"
         except IOError:
             pass
+        try:
+            os.remove("temp.bak")
+        except IOError:
+            pass
         FileStorage._FileStorage__objects = {}
 
     def test_new_method(self):
@@ -337,6 +1436,10 @@ class TestWithPlace(unittest.TestCase):
             FileStorage._FileStorage__file_path = "file.json"
         except IOError:
             pass
+        try:
+            os.remove("temp.bak")
+        except IOError:
+            pass
         FileStorage._FileStorage__objects = {}
 
     def test_new_method(self):
@@ -386,7 +1489,7 @@ class TestWithPlace(unittest.TestCase):
         self.assertEqual(type(storage_objs[key].longitude), float)
         self.assertEqual(storage_objs[key].longitude, 45.23)
 
-        self.assertEqual(type(storage_objs[key].amenity_ids), list)
+        self.assertIsInstance(storage_objs[key].amenity_ids, list)
         self.assertEqual(storage_objs[key].amenity_ids, list_amenity_ids)
 
 
@@ -409,6 +1512,10 @@ class TestWithAmenity(unittest.TestCase):
             FileStorage._FileStorage__file_path = "file.json"
         except IOError:
             pass
+        try:
+            os.remove("temp.bak")
+        except IOError:
+            pass
         FileStorage._FileStorage__objects = {}
 
     def test_new_method(self):
@@ -459,6 +1566,10 @@ class TestWithReview(unittest.TestCase):
             FileStorage._FileStorage__file_path = "file.json"
         except IOError:
             pass
+        try:
+            os.remove("temp.bak")
+        except IOError:
+            pass
         FileStorage._FileStorage__objects = {}
 
     def test_new_method(self):
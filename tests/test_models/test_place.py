@@ -56,4 +56,17 @@ class test_Place(test_basemodel):
 
     def test_amenity_ids(self):
         """ """
-        self.assertEqual(type(self.new.amenity_ids), list)
+        self.assertIsInstance(self.new.amenity_ids, list)
+
+    def test_amenity_ids_per_instance(self):
+        """ """
+        other = Place()
+        other.amenity_ids.append("a")
+        self.assertNotIn("a", self.new.amenity_ids)
+
+    def test_amenity_ids_to_dict(self):
+        """ """
+        self.new.amenity_ids = ["a", "b", "a"]
+        self.new.amenity_ids = self.new.amenity_ids + ["c"]
+        self.assertEqual(self.new.amenity_ids, ["a", "b", "c"])
+        self.assertEqual(self.new.to_dict()["amenity_ids"], ["a", "b", "c"])